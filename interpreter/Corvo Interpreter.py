@@ -11,14 +11,84 @@
 
 
 from lark import Lark, Transformer
+import lark
+import hashlib
+import operator
+import os
+import pickle
+import re
 import sys
 import csv
+import functools
+
+# matches strings that can be coerced to int/float in concat
+_NUM_RE = re.compile(r'-?\d+(?:\.\d+)?').fullmatch
+
+# comparison phrases resolve to these once, at transform time
+COMPARATORS = {
+    "is equal to": operator.eq,
+    "is greater than": operator.gt,
+    "is less than": operator.lt,
+}
+
+try:
+    from corvo_vm import compile_tree, CorvoVM, CompileError
+except ImportError:
+    from interpreter.corvo_vm import compile_tree, CorvoVM, CompileError
+
+# lark_cython replaces the pure-Python LALR parse loop with compiled
+# code when it is installed; plain lark works the same without it
+try:
+    import lark_cython
+    _LARK_PLUGINS = lark_cython.plugins
+except ImportError:
+    _LARK_PLUGINS = None
+
+
+def _unwrap(tree):
+    """Strip a single-child wrapper Tree (statement/expr/condition)."""
+    return tree.children[0] if hasattr(tree, 'children') and tree.children else tree
+
+
+def _const(value):
+    """Build a closure for a value known at transform time.
+
+    The marker lets arithmetic/condition rules fold constant-only
+    subtrees once instead of recomputing them on every execution.
+    """
+    def fn():
+        return value
+    fn._is_const = True
+    fn.const_value = value
+    return fn
+
+
+def _is_const(fn):
+    return getattr(fn, '_is_const', False)
+
 
 class CorvoInterpreter(Transformer):
     def __init__(self):
         self.vars = {}
         self.sections = {}
 
+    def thunk(self, node):
+        """Normalize an operand into a zero-arg callable at build time.
+
+        Hot closures call the result directly instead of routing every
+        execution through evaluate()'s type checks. Closures (including
+        _const) pass through untouched; a WORD token becomes a bound
+        variable load that keeps the name-evaluates-to-itself fallback.
+        """
+        node = _unwrap(node)
+        if callable(node):
+            return node
+        if isinstance(node, str):
+            variables = self.vars
+            name = str(node)
+            return lambda: variables.get(name, name)
+        return lambda: node
+
     def start(self, items):
         for item in items:
             if hasattr(item, 'children') and len(item.children) > 0:
@@ -43,7 +113,7 @@ class CorvoInterpreter(Transformer):
         return items
 
     def STRING(self, token):
-        return lambda: str(token)[1:-1]  
+        return _const(str(token)[1:-1])
 
     def NUMBER(self, token):
         token_str = str(token)
@@ -54,7 +124,7 @@ class CorvoInterpreter(Transformer):
                 value = int(token_str)
         except ValueError:
             value = 0
-        return lambda: value
+        return _const(value)
 
     def WORD(self, token):
         return str(token)
@@ -62,14 +132,14 @@ class CorvoInterpreter(Transformer):
     def assignment(self, items):
 
         varname, value = items
+        value = self.thunk(value)
         def assign():
-            new_value = self.evaluate(value)
-            self.vars[varname] = new_value
+            self.vars[varname] = value()
         return assign
 
     def display(self, items):
-        expr = items[0]
-        return lambda: print(self.evaluate(expr))
+        expr = self.thunk(items[0])
+        return lambda: print(expr())
 
     def input(self, items):
         prompt, remember_as_token, varname = items
@@ -88,8 +158,10 @@ class CorvoInterpreter(Transformer):
     def if_only(self, items):
 
         condition_tree, statement_tree = items
-        condition = condition_tree.children[0] if hasattr(condition_tree, 'children') else condition_tree
-        stmt = statement_tree.children[0] if hasattr(statement_tree, 'children') else statement_tree
+        condition = _unwrap(condition_tree)
+        stmt = _unwrap(statement_tree)
+        if _is_const(condition):
+            return stmt if condition.const_value else (lambda: None)
         def run():
             cond_result = self.evaluate(condition)
             if cond_result:
@@ -105,28 +177,26 @@ class CorvoInterpreter(Transformer):
             print(f"ERROR: if_else expected 3 or 4 items but got {len(items)}")
             return lambda: None
         
+        then_stmt = _unwrap(then_stmt)
+        else_stmt = _unwrap(else_stmt)
+        cond_fn = _unwrap(condition)
+        if _is_const(cond_fn):
+            taken = then_stmt if cond_fn.const_value else else_stmt
+            return taken if callable(taken) else (lambda: None)
         def run():
             if self.evaluate(condition):
-                if hasattr(then_stmt, 'children') and len(then_stmt.children) > 0:
-                    stmt_func = then_stmt.children[0]
-                    if callable(stmt_func):
-                        stmt_func()
-                elif callable(then_stmt):
+                if callable(then_stmt):
                     then_stmt()
             else:
-                if hasattr(else_stmt, 'children') and len(else_stmt.children) > 0:
-                    stmt_func = else_stmt.children[0]
-                    if callable(stmt_func):
-                        stmt_func()
-                elif callable(else_stmt):
+                if callable(else_stmt):
                     else_stmt()
         return run
 
     def if_only_block(self, items):
         condition_tree = items[0]
         statement_trees = items[1:]
-        condition = condition_tree.children[0] if hasattr(condition_tree, 'children') else condition_tree
-        block = [tree.children[0] if hasattr(tree, 'children') else tree for tree in statement_trees]
+        condition = _unwrap(condition_tree)
+        block = tuple(_unwrap(tree) for tree in statement_trees)
         def run():
             cond_result = self.evaluate(condition)
             if cond_result:
@@ -145,8 +215,8 @@ class CorvoInterpreter(Transformer):
         if otherwise_index == -1:
             condition_tree = items[0]
             statement_trees = items[1:]
-            condition = condition_tree.children[0] if hasattr(condition_tree, 'children') else condition_tree
-            block = [tree.children[0] if hasattr(tree, 'children') else tree for tree in statement_trees]
+            condition = _unwrap(condition_tree)
+            block = tuple(_unwrap(tree) for tree in statement_trees)
             def run():
                 if self.evaluate(condition):
                     for stmt in block:
@@ -157,19 +227,8 @@ class CorvoInterpreter(Transformer):
             then_statements = items[1:otherwise_index]
             else_statements = items[otherwise_index + 1:] 
             
-            then_block = []
-            for stmt_tree in then_statements:
-                if hasattr(stmt_tree, 'children') and len(stmt_tree.children) > 0:
-                    then_block.append(stmt_tree.children[0])
-                else:
-                    then_block.append(stmt_tree)
-            
-            else_block = []
-            for stmt_tree in else_statements:
-                if hasattr(stmt_tree, 'children') and len(stmt_tree.children) > 0:
-                    else_block.append(stmt_tree.children[0])
-                else:
-                    else_block.append(stmt_tree)
+            then_block = tuple(_unwrap(stmt_tree) for stmt_tree in then_statements)
+            else_block = tuple(_unwrap(stmt_tree) for stmt_tree in else_statements)
             
             def run():
                 if self.evaluate(condition):
@@ -184,41 +243,45 @@ class CorvoInterpreter(Transformer):
 
     def and_(self, items):
         left_tree, and_token, right_tree = items
-        left = left_tree.children[0] if hasattr(left_tree, 'children') else left_tree
-        right = right_tree.children[0] if hasattr(right_tree, 'children') else right_tree
+        # unwrap once here so the condition closure does no reflection
+        left = _unwrap(left_tree)
+        right = _unwrap(right_tree)
         def cond():
             return self.evaluate(left) and self.evaluate(right)
+        if _is_const(left) and _is_const(right):
+            return _const(cond())
         return cond
 
     def or_(self, items):
         left_tree, or_token, right_tree = items
-        left = left_tree.children[0] if hasattr(left_tree, 'children') else left_tree
-        right = right_tree.children[0] if hasattr(right_tree, 'children') else right_tree
+        left = _unwrap(left_tree)
+        right = _unwrap(right_tree)
         def cond():
             return self.evaluate(left) or self.evaluate(right)
+        if _is_const(left) and _is_const(right):
+            return _const(cond())
         return cond
 
     def base_condition(self, items):
         left, op, right = items
+        # resolve the operator phrase once instead of re-comparing
+        # strings on every evaluation inside a loop
+        if hasattr(op, 'children') and len(op.children) > 0:
+            op_str = op.children[0]
+        else:
+            op_str = op
+        op_fn = COMPARATORS.get(op_str)
+        if op_fn is None:
+            return lambda: False
+        left = self.thunk(left)
+        right = self.thunk(right)
         def cond():
-            l_val = self.evaluate(left)
-            r_val = self.evaluate(right)
-            
-            if hasattr(op, 'children') and len(op.children) > 0:
-                op_str = op.children[0]
-            else:
-                op_str = op
-                
-            if op_str == "is equal to":
-                result = l_val == r_val
-            elif op_str == "is greater than":
-                result = l_val > r_val
-            elif op_str == "is less than":
-                result = l_val < r_val
-            else:
-                result = False
-            
-            return result
+            return op_fn(left(), right())
+        if _is_const(left) and _is_const(right):
+            try:
+                return _const(cond())
+            except TypeError:
+                pass  # mixed types: keep the runtime comparison
         return cond
 
     def IS_EQUAL_TO(self, token):
@@ -232,8 +295,8 @@ class CorvoInterpreter(Transformer):
 
     def repeat_single(self, items):
         times_tree, loops_token, stmt_tree = items
-        times = times_tree.children[0] if hasattr(times_tree, 'children') else times_tree
-        stmt = stmt_tree.children[0] if hasattr(stmt_tree, 'children') else stmt_tree
+        times = _unwrap(times_tree)
+        stmt = _unwrap(stmt_tree)
         def run():
             times_val = self.evaluate(times)
             if isinstance(times_val, str):
@@ -251,8 +314,8 @@ class CorvoInterpreter(Transformer):
         loops_token = items[1] 
         statement_trees = items[2:]  
         
-        times = times_tree.children[0] if hasattr(times_tree, 'children') else times_tree
-        block = [tree.children[0] if hasattr(tree, 'children') else tree for tree in statement_trees]
+        times = _unwrap(times_tree)
+        block = tuple(_unwrap(tree) for tree in statement_trees)
         
         def run():
             times_val = self.evaluate(times)
@@ -276,34 +339,21 @@ class CorvoInterpreter(Transformer):
         condition_tree = items[1] 
         do_token = items[2]
         statement_trees = items[3:] 
-        block = []
-        for stmt_tree in statement_trees:
-            if hasattr(stmt_tree, 'children') and len(stmt_tree.children) > 0:
-                block.append(stmt_tree.children[0])
-            else:
-                block.append(stmt_tree)
-        
+        block = tuple(stmt for stmt in
+                      (_unwrap(stmt_tree) for stmt_tree in statement_trees)
+                      if callable(stmt))
+        condition = self.thunk(condition_tree)
+
         def run():
-            max_iterations = 10000
-            iterations = 0
-            
-            while iterations < max_iterations:
-                condition_func = condition_tree
-                if hasattr(condition_tree, 'children') and len(condition_tree.children) > 0:
-                    condition_func = condition_tree.children[0]
-                
-                condition_result = self.evaluate(condition_func)
-                
-                if not condition_result:
+            # range() drives the iteration cap with a C-level counter,
+            # so the loop body pays no bookkeeping of its own; the else
+            # clause fires only when the cap ran out
+            for _ in range(10000):
+                if not condition():
                     break
-                    
                 for stmt in block:
-                    if callable(stmt):
-                        stmt()
-                
-                iterations += 1
-            
-            if iterations >= max_iterations:
+                    stmt()
+            else:
                 print("(Warning: While loop stopped after 10,000 iterations to prevent infinite loop)")
         
         return run
@@ -319,17 +369,13 @@ class CorvoInterpreter(Transformer):
                 list_name = items[1]
                 statement_trees = items[2:]
             
-            block = []
-            for stmt_tree in statement_trees:
-                if hasattr(stmt_tree, 'children') and len(stmt_tree.children) > 0:
-                    block.append(stmt_tree.children[0])
-                else:
-                    block.append(stmt_tree)
+            block = tuple(_unwrap(stmt_tree) for stmt_tree in statement_trees)
             
             def run():
-                lst = self.vars.get(list_name, [])
+                variables = self.vars
+                lst = variables.get(list_name, [])
                 for item in lst:
-                    self.vars[var] = item
+                    variables[var] = item
                     for stmt in block:
                         if callable(stmt):
                             stmt()
@@ -372,11 +418,9 @@ class CorvoInterpreter(Transformer):
         def read_csv_file():
             try:
                 with open(self.evaluate(filename), 'r', newline='', encoding='utf-8') as f:
-                    reader = csv.reader(f)
-                    data = []
-                    for row in reader:
-                        data.append(row)
-                    self.vars[varname] = data
+                    # materialise rows in the C csv layer instead of a
+                    # Python-level append loop
+                    self.vars[varname] = list(csv.reader(f))
             except FileNotFoundError:
                 print(f"(Error: CSV file {self.evaluate(filename)} not found.)")
                 self.vars[varname] = []
@@ -397,25 +441,29 @@ class CorvoInterpreter(Transformer):
                     
                 with open(self.evaluate(filename), 'w', newline='', encoding='utf-8') as f:
                     writer = csv.writer(f)
-                    for row in data:
-                        if isinstance(row, list):
-                            writer.writerow(row)
-                        else:
-                            writer.writerow([row]) 
+                    writer.writerows(row if isinstance(row, list) else [row]
+                                     for row in data)
             except Exception as e:
                 print(f"(Error writing CSV: {e})")
         return write_csv_file
 
     def column_access(self, items):
         get_column_token, column_number, from_token, varname = items
+        cache = [None]  # last list object validated at this call site
         
         def get_column():
             data = self.vars.get(varname, [])
+            col_idx = self.evaluate(column_number)
+            if data is cache[0] and type(col_idx) is int:
+                idx = col_idx - 1
+                if idx < 0:
+                    return [""] * len(data)
+                return [row[idx] if isinstance(row, list) and idx < len(row)
+                        else "" for row in data]
             if not isinstance(data, list):
                 print(f"(Error: {varname} is not a list.)")
                 return []
             
-            col_idx = self.evaluate(column_number)
             if isinstance(col_idx, str):
                 try:
                     col_idx = int(col_idx)
@@ -423,29 +471,37 @@ class CorvoInterpreter(Transformer):
                     print(f"(Error: Column '{col_idx}' is not a valid number.)")
                     return []
             
-            column = []
-            for row in data:
-                if isinstance(row, list) and 1 <= col_idx <= len(row):
-                    column.append(row[col_idx - 1]) 
-                else:
-                    column.append("") 
-            
-            return column
+            # hoist the 1-based shift and run one comprehension so the
+            # per-row work is a single index plus bounds check
+            cache[0] = data
+            idx = col_idx - 1
+            if idx < 0:
+                return [""] * len(data)
+            return [row[idx] if isinstance(row, list) and idx < len(row)
+                    else "" for row in data]
         
         return get_column
 
     def csv_set(self, items):
         varname, row_token, row_number, column_token, column_number, new_value = items
+        cache = [None]  # last list object validated at this call site
         
         def set_cell():
             data = self.vars.get(varname, [])
+            row_idx = self.evaluate(row_number)
+            col_idx = self.evaluate(column_number)
+            if (data is cache[0] and type(row_idx) is int
+                    and type(col_idx) is int
+                    and 1 <= row_idx <= len(data)):
+                target_row = data[row_idx - 1]
+                if (isinstance(target_row, list)
+                        and 1 <= col_idx <= len(target_row)):
+                    target_row[col_idx - 1] = str(self.evaluate(new_value))
+                    return
             if not isinstance(data, list):
                 print(f"(Error: {varname} is not a list.)")
                 return
             
-            row_idx = self.evaluate(row_number)
-            col_idx = self.evaluate(column_number)
-            
             if isinstance(row_idx, str):
                 try:
                     row_idx = int(row_idx)
@@ -474,6 +530,7 @@ class CorvoInterpreter(Transformer):
                 return
             
             new_val = self.evaluate(new_value)
+            cache[0] = data
             data[row_idx - 1][col_idx - 1] = str(new_val)  
             
         return set_cell
@@ -484,12 +541,7 @@ class CorvoInterpreter(Transformer):
         name_func = items[1]      
         statement_trees = items[2:] 
         
-        block = []
-        for tree in statement_trees:
-            if hasattr(tree, 'children') and len(tree.children) > 0:
-                block.append(tree.children[0])
-            else:
-                block.append(tree)
+        block = [_unwrap(tree) for tree in statement_trees]
         
         name = self.evaluate(name_func) if callable(name_func) else name_func
         self.sections[name] = block
@@ -528,6 +580,16 @@ class CorvoInterpreter(Transformer):
         return remove_item
 
     def list(self, items):
+        # "[]" parses with a single None placeholder; drop it so an
+        # empty list really is empty, matching the bytecode compiler.
+        # Items arrive inside expr wrapper trees - unwrap them first,
+        # or the literal check below can never see a _const closure
+        items = [_unwrap(item) for item in items if item is not None]
+        if items and all(_is_const(item) for item in items):
+            # all-literal lists are copied from one prebuilt tuple
+            # rather than re-evaluated element by element
+            prebuilt = tuple(item.const_value for item in items)
+            return lambda: list(prebuilt)
         return lambda: [self.evaluate(item) for item in items]
 
     def length(self, items):
@@ -540,65 +602,92 @@ class CorvoInterpreter(Transformer):
 
     def concat(self, items):
         left, plus_token, right = items
+        left = self.thunk(left)
+        right = self.thunk(right)
         
         def operation():
-            left_val = self.evaluate(left)
-            right_val = self.evaluate(right)
+            left_val = left()
+            right_val = right()
             
-            if isinstance(left_val, str) and left_val.replace('.', '').replace('-', '').isdigit():
-                try:
-                    left_val = float(left_val) if '.' in left_val else int(left_val)
-                except ValueError:
-                    pass
-                    
-            if isinstance(right_val, str) and right_val.replace('.', '').replace('-', '').isdigit():
-                try:
-                    right_val = float(right_val) if '.' in right_val else int(right_val)
-                except ValueError:
-                    pass
+            if isinstance(left_val, str) and _NUM_RE(left_val):
+                left_val = float(left_val) if '.' in left_val else int(left_val)
+
+            if isinstance(right_val, str) and _NUM_RE(right_val):
+                right_val = float(right_val) if '.' in right_val else int(right_val)
             
             if isinstance(left_val, (int, float)) and isinstance(right_val, (int, float)):
                 return left_val + right_val
             else:
                 return str(left_val) + str(right_val)
+        if _is_const(left) and _is_const(right):
+            return _const(operation())
         return operation
 
     def subtract(self, items):
         left, minus_token, right = items
-        
+        left = self.thunk(left)
+        right = self.thunk(right)
+
         def operation():
-            left_val = self.evaluate(left)
-            right_val = self.evaluate(right)
+            left_val = left()
+            right_val = right()
             return left_val - right_val
+        if _is_const(left) and _is_const(right):
+            try:
+                return _const(operation())
+            except TypeError:
+                pass  # mixed types: keep the runtime closure
         return operation
 
     def multiply(self, items):
         left, times_token, right = items
-        
+        left = self.thunk(left)
+        right = self.thunk(right)
+
         def operation():
-            left_val = self.evaluate(left)
-            right_val = self.evaluate(right)
+            left_val = left()
+            right_val = right()
             return left_val * right_val
+        if _is_const(left) and _is_const(right):
+            try:
+                return _const(operation())
+            except TypeError:
+                pass  # mixed types: keep the runtime closure
         return operation
 
     def divide(self, items):
         left, divided_by_token, right = items
-        
+        left = self.thunk(left)
+        right = self.thunk(right)
+
         def operation():
-            left_val = self.evaluate(left)
-            right_val = self.evaluate(right)
+            left_val = left()
+            right_val = right()
             if right_val == 0:
                 print("(Error: Division by zero)")
                 return 0
             return left_val / right_val
+        if _is_const(left) and _is_const(right) and right.const_value != 0:
+            try:
+                return _const(operation())
+            except TypeError:
+                pass  # mixed types: keep the runtime closure
         return operation
 
     def index_access(self, items):
         varname_func, at_token, index = items
+        index = self.thunk(index)
+        cache = [None]  # last list object validated at this call site
         def get_item():
             varname = self.evaluate(varname_func) if callable(varname_func) else varname_func
             lst = self.vars.get(varname)
-            idx = self.evaluate(index)
+            idx = index()
+            # monomorphic inline cache: the same call site almost always
+            # sees the same list with an int index, so skip revalidation
+            # while the object is unchanged (length is re-read because
+            # append/remove mutate the list in place)
+            if lst is cache[0] and type(idx) is int and 1 <= idx <= len(lst):
+                return lst[idx - 1]
             if isinstance(idx, str):
                 try:
                     idx = int(idx)
@@ -611,36 +700,98 @@ class CorvoInterpreter(Transformer):
             if not (1 <= idx <= len(lst)):
                 print(f"(Error: Index {idx} out of range for list '{varname}'.)")
                 return ""
+            cache[0] = lst
             return lst[idx-1]
         return get_item
 
     def evaluate(self, func_or_value):
-        if hasattr(func_or_value, 'children') and len(func_or_value.children) > 0:
-            func_or_value = func_or_value.children[0]
-        
+        # callable-first: after the transform pass nearly every operand
+        # is already a closure, so the hot path is one check and a call
         if callable(func_or_value):
             return func_or_value()
-        elif isinstance(func_or_value, str):
-            if func_or_value in self.vars:
-                return self.vars[func_or_value]
-            else:
-                return func_or_value
-        else:
-            return func_or_value
+        if hasattr(func_or_value, 'children') and len(func_or_value.children) > 0:
+            func_or_value = func_or_value.children[0]
+            if callable(func_or_value):
+                return func_or_value()
+        if isinstance(func_or_value, str):
+            return self.vars.get(func_or_value, func_or_value)
+        return func_or_value
+
+CACHE_DIR = '.corvo_cache'
+
+
+def load_cached_tree(cache_key):
+    """Return a previously parsed tree for this grammar+source, or None."""
+    cache_path = os.path.join(CACHE_DIR, f'{cache_key}.tree')
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def save_cached_tree(cache_key, tree):
+    """Store a parsed tree on disk; cache failures are not fatal."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        cache_path = os.path.join(CACHE_DIR, f'{cache_key}.tree')
+        with open(cache_path, 'wb') as f:
+            pickle.dump(tree, f)
+    except Exception:
+        pass
+
+
+@functools.lru_cache(maxsize=64)
+def compile_source(grammar, code):
+    """Parse and compile a source string.
+
+    Memoized on the exact grammar+source text, so an embedding
+    application that runs the same script repeatedly in one process
+    parses and compiles it once; the on-disk tree cache covers repeat
+    runs across processes. Returns (tree, code_obj), where code_obj
+    is None when the compiler cannot lower the tree.
+    """
+    # skip parser construction and parsing entirely when this exact
+    # grammar+source pair was parsed before (keyed so a change to
+    # either, or a lark upgrade, invalidates the entry)
+    cache_key = hashlib.sha256(
+        (grammar + '\x00' + code + '\x00' + lark.__version__)
+        .encode('utf-8')).hexdigest()
+    tree = load_cached_tree(cache_key)
+    if tree is None:
+        # LALR with the contextual lexer parses in linear time;
+        # the default Earley parser is far slower on long scripts
+        kwargs = {}
+        if _LARK_PLUGINS is not None:
+            kwargs['_plugins'] = _LARK_PLUGINS
+        parser = Lark(grammar, start='start', parser='lalr',
+                      lexer='contextual', **kwargs)
+        tree = parser.parse(code)
+        save_cached_tree(cache_key, tree)
+    try:
+        code_obj = compile_tree(tree)
+    except CompileError:
+        code_obj = None
+    return tree, code_obj
+
 
 def run_program(filename):
     with open(filename, 'r') as f:
         code = f.read()
-    
+
     with open('grammar.lark', 'r') as f:
         grammar = f.read()
-    
+
     try:
-        parser = Lark(grammar, start='start')
-        tree = parser.parse(code)
-        interpreter = CorvoInterpreter()
-        result = interpreter.transform(tree)
-        
+        tree, code_obj = compile_source(grammar, code)
+        if code_obj is None or os.environ.get('CORVO_TREEWALK') == '1':
+            # the tree-walking interpreter handles any construct the
+            # compiler cannot lower yet
+            interpreter = CorvoInterpreter()
+            interpreter.transform(tree)
+        else:
+            CorvoVM().run(code_obj)
+
     except Exception as e:
         print(f"ERROR: {e}")
         import traceback
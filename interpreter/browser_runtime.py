@@ -17,31 +17,70 @@
 #     run_corvo(source_code: str) -> tuple[str, str]
 #         Returns (program_output, debug_info_string)
 
-from lark import Lark, Transformer
+from lark import Lark, Token, Transformer, Tree
 import csv
+import functools
+import io
+import os
+import re
+import sys
+from operator import eq as _eq, gt as _gt, lt as _lt
 RUNTIME_ID = "Corvo Browser Runtime 2025-11-05"
 
+# lark_cython replaces Lark's pure-Python lexer and LALR loop with
+# compiled code when it is installed; plain lark behaves identically
+# without it, which is what Pyodide builds without the extension get.
+# Set CORVO_LARK_CYTHON=0 to force the pure-Python path.
+_LARK_PLUGINS = None
+if os.environ.get('CORVO_LARK_CYTHON') != '0':
+    try:
+        import lark_cython
+        _LARK_PLUGINS = lark_cython.plugins
+    except ImportError:
+        pass
+
 
 CORVO_GRAMMAR = r"""
+// The grammar is written to be LALR(1):
+// - arithmetic is a left-recursive expr/term/factor ladder instead
+//   of the ambiguous  expr OP expr  form; "plus" binds loosest, the
+//   other operators bind tighter, all associate left
+// - statements are split into closed ones (can never absorb a
+//   following "otherwise") and open ones (end in an if that still
+//   could), the classic matched/unmatched dangling-else treatment:
+//   every baseline statement form stays accepted and "otherwise"
+//   always binds to the nearest "if"
+
+
 start: statement*
 
-statement: assignment
-         | display
-         | input
-         | conditional
-         | repeat
-         | while
-         | for_loop
-		 | repeat
-         | write
-         | read
-         | csv_read
-         | csv_write
-         | csv_set
-         | section_def
-         | list_append
-         | list_remove
-         | section_call
+?statement: closed_stmt
+         | open_stmt
+
+?closed_stmt: assignment
+            | display
+            | input
+            | while_
+            | for_loop
+            | write
+            | read
+            | csv_read
+            | csv_write
+            | csv_set
+            | section_def
+            | list_append
+            | list_remove
+            | section_call
+            | "repeat" expr LOOPS closed_stmt                     -> repeat_single
+            | "repeat" expr LOOPS ":" "[" statement* "]"          -> repeat_block
+            | "if" condition "then" closed_stmt OTHERWISE closed_stmt  -> if_else
+            | "if" condition "then" ":" "[" statement* "]" OTHERWISE ":" "[" statement* "]"  -> if_else_block
+
+?open_stmt: "repeat" expr LOOPS open_stmt                         -> repeat_single
+          | "if" condition "then" closed_stmt                     -> if_only
+          | "if" condition "then" open_stmt                       -> if_only
+          | "if" condition "then" closed_stmt OTHERWISE open_stmt -> if_else
+          | "if" condition "then" ":" "[" statement* "]"          -> if_only_block
 
 assignment: "the" WORD "is" expr
 
@@ -49,21 +88,13 @@ display: "display" expr
 
 input: "ask" expr REMEMBER_AS WORD
 
-conditional: "if" condition "then" statement OTHERWISE statement  -> if_else
-           | "if" condition "then" statement                     -> if_only
-           | "if" condition "then" ":" "[" statement* "]" OTHERWISE ":" "[" statement* "]"  -> if_else_block
-           | "if" condition "then" ":" "[" statement* "]"         -> if_only_block
-
-condition: base_condition
-         | condition AND condition  -> and_
-         | condition OR condition   -> or_
+?condition: condition AND base_condition  -> and_
+         | condition OR base_condition   -> or_
+         | base_condition
 
 base_condition: expr comparator expr
 
-repeat: "repeat" expr LOOPS statement                              -> repeat_single
-      | "repeat" expr LOOPS ":" "[" statement* "]"                 -> repeat_block
-
-while: WHILE condition DO ":" "[" statement* "]"
+while_: WHILE condition DO ":" "[" statement* "]"
 
 for_loop: "for" "each" WORD "in" WORD ":" "[" statement* "]"
 
@@ -85,32 +116,32 @@ list_remove: "remove" expr "from" WORD
 
 section_call: WORD
 
-expr: list
-    | length
-    | count
-    | concat
-    | math_expr
-    | index_access
-    | column_access
-    | STRING
-    | NUMBER
-    | WORD
+?expr: expr PLUS term          -> concat
+    | term
 
-list: "[" [expr ("," expr)*] "]"
+?term: term MINUS factor      -> subtract
+     | term TIMES factor      -> multiply
+     | term DIVIDED_BY factor -> divide
+     | factor
 
-length: LENGTH_OF expr
+?factor: list
+       | length
+       | count
+       | index_access
+       | column_access
+       | STRING
+       | NUMBER
+       | WORD
 
-count: COUNT_OF WORD
+list: "[" [expr ("," expr)*] "]"
 
-concat: expr PLUS expr
+length: LENGTH_OF factor
 
-math_expr: expr MINUS expr        -> subtract
-         | expr TIMES expr        -> multiply
-         | expr DIVIDED_BY expr   -> divide
+count: COUNT_OF WORD
 
-index_access: WORD AT expr
+index_access: WORD AT factor
 
-column_access: GET_COLUMN expr FROM WORD
+column_access: GET_COLUMN factor FROM WORD
 
 comparator: IS_EQUAL_TO
           | IS_GREATER_THAN
@@ -148,10 +179,431 @@ DIVIDED_BY.10: "divided by"
 %import common.NUMBER
 %ignore WS
 %ignore COMMENT
-
 """
 
 
+# The Lark parser is built lazily: grammar analysis is by far the most
+# expensive part of Lark and dominates cold start under Pyodide, and
+# the hand-written parser below covers normal programs without it.
+# Lark is still the authority for anything the fast parser rejects -
+# including the wording of syntax errors. Set CORVO_RD_PARSER=0 to
+# route every parse through Lark.
+_PARSER = None
+
+_USE_RD_PARSER = os.environ.get('CORVO_RD_PARSER', '1') != '0'
+
+
+def _lark_parser():
+    """Build (once) and return the Lark LALR parser."""
+    global _PARSER
+    if _PARSER is None:
+        kwargs = {}
+        if _LARK_PLUGINS is not None:
+            kwargs['_plugins'] = _LARK_PLUGINS
+        _PARSER = Lark(CORVO_GRAMMAR, start='start', parser='lalr',
+                       lexer='contextual', **kwargs)
+    return _PARSER
+
+
+# -------------------------------------------------
+# Hand-written recursive-descent parser
+# -------------------------------------------------
+# Corvo's grammar is small and LL(1)-ish, so a direct tokenizer plus
+# recursive descent beats the generated parser and skips Lark's
+# table-construction cost entirely. It produces the same Tree/Token
+# shapes as the LALR grammar above (named terminals kept, inline
+# literals filtered, [None] for an empty list) so the transformer and
+# the bytecode compiler cannot tell the two parsers apart. Anything it
+# cannot handle - including variables that reuse keyword names, which
+# only the contextual lexer untangles - raises _RDParseError and the
+# caller retries with Lark.
+
+class _RDParseError(Exception):
+    pass
+
+
+_RD_KEYWORDS = {
+    # named terminals: kept in the tree where the grammar names them
+    "count of": "COUNT_OF", "loops": "LOOPS", "while": "WHILE",
+    "do": "DO", "at": "AT", "and": "AND", "or": "OR",
+    "otherwise": "OTHERWISE", "plus": "PLUS", "minus": "MINUS",
+    "times": "TIMES", "section": "SECTION",
+    "is equal to": "IS_EQUAL_TO", "is greater than": "IS_GREATER_THAN",
+    "is less than": "IS_LESS_THAN", "remember as": "REMEMBER_AS",
+    "read from": "READ_FROM", "read csv": "READ_CSV",
+    "to csv": "TO_CSV", "get column": "GET_COLUMN", "from": "FROM",
+    "row": "ROW", "column": "COLUMN", "length of": "LENGTH_OF",
+    "divided by": "DIVIDED_BY",
+    # anonymous keywords: consumed by the parser, filtered from trees
+    "the": "_THE", "is": "_IS", "display": "_DISPLAY", "ask": "_ASK",
+    "if": "_IF", "then": "_THEN", "repeat": "_REPEAT", "for": "_FOR",
+    "each": "_EACH", "in": "_IN", "write": "_WRITE", "to": "_TO",
+    "set": "_SET", "append": "_APPEND", "remove": "_REMOVE",
+}
+
+# longest phrase first so "is equal to" wins over "is", "to csv" over
+# "to", etc.; the lookahead stops keywords matching identifier prefixes
+_RD_TOKEN_RE = re.compile(
+    r'(?P<WS>\s+)'
+    r'|(?P<COMMENT>#[^\r\n]*)'
+    r'|(?P<STRING>"(?:\\.|[^"\\])*")'
+    r'|(?P<KW>(?:'
+    + '|'.join(sorted(_RD_KEYWORDS, key=len, reverse=True))
+    + r')(?![A-Za-z0-9_]))'
+    r'|(?P<NUMBER>\d+(?:\.\d+)?)'
+    r'|(?P<WORD>[A-Za-z_][A-Za-z0-9_]*)'
+    r'|(?P<PUNCT>[:\[\],])'
+)
+
+
+def _rd_tokenize(src):
+    # one finditer stream instead of a match() call per token keeps
+    # the scanning loop inside the regex engine's C code; a gap
+    # between consecutive matches means an untokenizable character
+    tokens = []
+    append = tokens.append
+    keywords = _RD_KEYWORDS
+    pos = 0
+    for m in _RD_TOKEN_RE.finditer(src):
+        if m.start() != pos:
+            raise _RDParseError(f"cannot tokenize at position {pos}")
+        pos = m.end()
+        kind = m.lastgroup
+        if kind == 'WS' or kind == 'COMMENT':
+            continue
+        text = m.group()
+        if kind == 'KW':
+            append(Token(keywords[text], text))
+        elif kind == 'PUNCT':
+            append(Token(text, text))
+        else:
+            append(Token(kind, text))
+    if pos != len(src):
+        raise _RDParseError(f"cannot tokenize at position {pos}")
+    return tokens
+
+
+_RD_TERM_OPS = {
+    'MINUS': 'subtract',
+    'TIMES': 'multiply',
+    'DIVIDED_BY': 'divide',
+}
+
+
+class _RDParser:
+
+    __slots__ = ('tokens', 'i', 'n')
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.i = 0
+        self.n = len(tokens)
+
+    # ---- token plumbing ----
+
+    def _ptype(self, offset=0):
+        i = self.i + offset
+        return self.tokens[i].type if i < self.n else None
+
+    def _next(self):
+        if self.i >= self.n:
+            raise _RDParseError("unexpected end of input")
+        tok = self.tokens[self.i]
+        self.i += 1
+        return tok
+
+    def _expect(self, ttype):
+        if self.i >= self.n or self.tokens[self.i].type != ttype:
+            raise _RDParseError(f"expected {ttype}")
+        tok = self.tokens[self.i]
+        self.i += 1
+        return tok
+
+    # ---- statements ----
+
+    def parse_start(self):
+        statements = []
+        while self.i < self.n:
+            statements.append(self.statement())
+        return Tree('start', statements)
+
+    def statement(self):
+        t = self._ptype()
+        if t == '_IF':
+            return self.conditional()
+        if t == '_REPEAT':
+            return self.repeat()
+        if t == 'WHILE':
+            return self.while_()
+        if t == '_FOR':
+            return self.for_loop()
+        if t == 'SECTION':
+            return self.section_def()
+        return self.simple_statement()
+
+    def simple_statement(self):
+        t = self._ptype()
+        if t == '_THE':
+            return self.assignment()
+        if t == '_DISPLAY':
+            self._next()
+            return Tree('display', [self.expr()])
+        if t == '_ASK':
+            self._next()
+            prompt = self.expr()
+            remember = self._expect('REMEMBER_AS')
+            return Tree('input', [prompt, remember, self._expect('WORD')])
+        if t == '_WRITE':
+            return self.write_or_csv_write()
+        if t == 'READ_FROM':
+            return self.read('read')
+        if t == 'READ_CSV':
+            return self.read('csv_read')
+        if t == '_SET':
+            return self.csv_set()
+        if t == '_APPEND':
+            self._next()
+            item = self.expr()
+            self._expect('_TO')
+            return Tree('list_append', [item, self._expect('WORD')])
+        if t == '_REMOVE':
+            self._next()
+            item = self.expr()
+            self._expect('FROM')
+            return Tree('list_remove', [item, self._expect('WORD')])
+        if t == 'WORD':
+            return Tree('section_call', [self._next()])
+        raise _RDParseError(f"unexpected token {t}")
+
+    def assignment(self):
+        self._next()
+        varname = self._expect('WORD')
+        self._expect('_IS')
+        return Tree('assignment', [varname, self.expr()])
+
+    def conditional(self):
+        self._next()
+        cond = self.condition()
+        self._expect('_THEN')
+        if self._ptype() == ':':
+            then_block = self.block()
+            if self._ptype() == 'OTHERWISE':
+                otherwise = self._next()
+                else_block = self.block()
+                return Tree('if_else_block',
+                            [cond] + then_block + [otherwise] + else_block)
+            return Tree('if_only_block', [cond] + then_block)
+        # full statement bodies, like the grammar's closed/open split;
+        # parsing the branch greedily makes a trailing "otherwise"
+        # bind to the nearest "if", exactly as LALR shifts it
+        then_stmt = self.statement()
+        if self._ptype() == 'OTHERWISE':
+            otherwise = self._next()
+            return Tree('if_else',
+                        [cond, then_stmt, otherwise, self.statement()])
+        return Tree('if_only', [cond, then_stmt])
+
+    def repeat(self):
+        self._next()
+        times = self.expr()
+        loops = self._expect('LOOPS')
+        if self._ptype() == ':':
+            return Tree('repeat_block', [times, loops] + self.block())
+        return Tree('repeat_single', [times, loops, self.statement()])
+
+    def while_(self):
+        while_tok = self._next()
+        cond = self.condition()
+        do_tok = self._expect('DO')
+        return Tree('while_', [while_tok, cond, do_tok] + self.block())
+
+    def for_loop(self):
+        self._next()
+        self._expect('_EACH')
+        var = self._expect('WORD')
+        self._expect('_IN')
+        list_name = self._expect('WORD')
+        return Tree('for_loop', [var, list_name] + self.block())
+
+    def write_or_csv_write(self):
+        self._next()
+        if self._ptype() == 'WORD' and self._ptype(1) == 'TO_CSV':
+            varname = self._next()
+            to_csv = self._next()
+            return Tree('csv_write', [varname, to_csv, self.expr()])
+        target = self.expr()
+        self._expect('_TO')
+        return Tree('write', [target, self.expr()])
+
+    def read(self, rule):
+        read_tok = self._next()
+        source = self.expr()
+        remember = self._expect('REMEMBER_AS')
+        return Tree(rule, [read_tok, source, remember, self._expect('WORD')])
+
+    def csv_set(self):
+        self._next()
+        varname = self._expect('WORD')
+        row_tok = self._expect('ROW')
+        row = self.expr()
+        col_tok = self._expect('COLUMN')
+        col = self.expr()
+        self._expect('_TO')
+        return Tree('csv_set', [varname, row_tok, row, col_tok, col,
+                                self.expr()])
+
+    def section_def(self):
+        section_tok = self._next()
+        name = self._expect('WORD')
+        self._expect('_IS')
+        self._expect('[')
+        body = []
+        while self._ptype() != ']':
+            body.append(self.statement())
+        self._next()
+        return Tree('section_def', [section_tok, name] + body)
+
+    def block(self):
+        self._expect(':')
+        self._expect('[')
+        statements = []
+        while self._ptype() != ']':
+            statements.append(self.statement())
+        self._next()
+        return statements
+
+    # ---- conditions and expressions ----
+
+    def condition(self):
+        node = self.base_condition()
+        while True:
+            t = self._ptype()
+            if t == 'AND':
+                op = self._next()
+                node = Tree('and_', [node, op, self.base_condition()])
+            elif t == 'OR':
+                op = self._next()
+                node = Tree('or_', [node, op, self.base_condition()])
+            else:
+                return node
+
+    def base_condition(self):
+        left = self.expr()
+        t = self._ptype()
+        if t not in ('IS_EQUAL_TO', 'IS_GREATER_THAN', 'IS_LESS_THAN'):
+            raise _RDParseError("expected comparator")
+        comparator = Tree('comparator', [self._next()])
+        return Tree('base_condition', [left, comparator, self.expr()])
+
+    def expr(self):
+        node = self.term()
+        while self._ptype() == 'PLUS':
+            op = self._next()
+            node = Tree('concat', [node, op, self.term()])
+        return node
+
+    def term(self):
+        node = self.factor()
+        ops = _RD_TERM_OPS
+        while True:
+            rule = ops.get(self._ptype())
+            if rule is None:
+                return node
+            op = self._next()
+            node = Tree(rule, [node, op, self.factor()])
+
+    def factor(self):
+        t = self._ptype()
+        if t == 'NUMBER' or t == 'STRING':
+            return self._next()
+        if t == 'WORD':
+            if self._ptype(1) == 'AT':
+                word = self._next()
+                at_tok = self._next()
+                return Tree('index_access', [word, at_tok, self.factor()])
+            return self._next()
+        if t == '[':
+            return self.list()
+        if t == 'LENGTH_OF':
+            length_of = self._next()
+            return Tree('length', [length_of, self.factor()])
+        if t == 'COUNT_OF':
+            count_of = self._next()
+            return Tree('count', [count_of, self._expect('WORD')])
+        if t == 'GET_COLUMN':
+            get_column = self._next()
+            col = self.factor()
+            from_tok = self._expect('FROM')
+            return Tree('column_access',
+                        [get_column, col, from_tok, self._expect('WORD')])
+        raise _RDParseError(f"unexpected token {t} in expression")
+
+    def list(self):
+        self._next()
+        if self._ptype() == ']':
+            self._next()
+            # Lark's [...] optional leaves a None placeholder here
+            return Tree('list', [None])
+        items = [self.expr()]
+        while self._ptype() == ',':
+            self._next()
+            items.append(self.expr())
+        self._expect(']')
+        return Tree('list', items)
+
+
+def _parse_source(source_code):
+    """Parse with the fast parser, deferring to Lark when it balks."""
+    if _USE_RD_PARSER:
+        try:
+            return _RDParser(_rd_tokenize(source_code)).parse_start()
+        except _RDParseError:
+            pass
+    return _lark_parser().parse(source_code)
+
+
+# matches strings that 'plus' coerces to int/float before adding
+_NUM_RE = re.compile(r'-?\d+(?:\.\d+)?').fullmatch
+
+
+_intern = sys.intern
+
+# comparator phrases as interned constants so every token handler and
+# the _OPS table share one string object per comparator
+_IS_EQUAL_TO = _intern("is equal to")
+_IS_GREATER_THAN = _intern("is greater than")
+_IS_LESS_THAN = _intern("is less than")
+
+# comparator text -> compare function, resolved once per condition at
+# build time by base_condition
+_OPS = {
+    _IS_EQUAL_TO: _eq,
+    _IS_GREATER_THAN: _gt,
+    _IS_LESS_THAN: _lt,
+}
+
+
+def _is_literal(value):
+    """True for a raw literal operand (plain str excludes _Var)."""
+    return type(value) in (int, float, str)
+
+
+class _Var(str):
+    """A WORD token: a name that reads as a variable at run time.
+
+    Subclassing str keeps every name-position consumer (dict keys,
+    section names, error messages) working on the token text, while
+    evaluate() can tell a name apart from a raw string literal by
+    exact type.
+    """
+    __slots__ = ()
+
+
+# one _Var per distinct name, shared across occurrences; str caches
+# its hash per object, so reused instances skip rehashing on lookups
+_VAR_CACHE = {}
+
+
 class CorvoInterpreter(Transformer):
     """
     CorvoInterpreter walks the parsed syntax tree and executes Corvo code.
@@ -159,104 +611,98 @@ class CorvoInterpreter(Transformer):
     This version is adapted for browser use:
     - Stores variables in self.vars
     - Stores defined sections (your "functions") in self.sections
-    - Appends output to self._stdout instead of printing
+    - Writes output to an in-memory self._stdout buffer instead of printing
     - Stubs blocking features (input, file I/O) so the browser sandbox is safe
     """
 
     def __init__(self):
         self.vars = {}
         self.sections = {}
-        self._stdout = []
+        # one growable buffer instead of a list of lines: no per-line
+        # list cell and no final join pass over every string
+        self._stdout = io.StringIO()
         self._max_loop_iterations = 10000  # safety against infinite loops
 
     # ========== helpers ==========
 
     def _print(self, value):
-        """Append text to output buffer instead of printing to console."""
-        self._stdout.append(str(value))
+        """Write a line to the output buffer instead of the console."""
+        self._stdout.write(str(value) + '\n')
 
     def evaluate(self, func_or_value):
         """
-        Your original interpreter sometimes returns callables (lambdas),
-        sometimes raw values, sometimes tree nodes with .children.
+        Resolve an operand to its value.
 
-        This normalize step is basically the same logic you already wrote.
+        Operands are type-tagged at build time: a _Var is a variable
+        name, a callable is a computed expression, and raw literals
+        (from STRING/NUMBER) pass through untouched. Wrapper trees
+        unwrap one level and re-dispatch.
         """
-        if hasattr(func_or_value, 'children') and len(func_or_value.children) > 0:
-            func_or_value = func_or_value.children[0]
-
+        if type(func_or_value) is _Var:
+            # variable lookup; an unset name evaluates to itself
+            return self.vars.get(func_or_value, func_or_value)
         if callable(func_or_value):
             return func_or_value()
-        elif isinstance(func_or_value, str):
-            # variable lookup fallback
-            if func_or_value in self.vars:
-                return self.vars[func_or_value]
-            else:
-                return func_or_value
-        else:
-            return func_or_value
+        if hasattr(func_or_value, 'children') and len(func_or_value.children) > 0:
+            return self.evaluate(func_or_value.children[0])
+        return func_or_value
 
     # ========== program start ==========
 
     def start(self, items):
         """
-        Runs each top-level statement or block in sequence.
-        Mirrors your start() method, but uses _print() for errors.
+        Runs each top-level statement in sequence.
+
+        Grammar inlining delivers every statement as a closure, and the
+        while_ rule name maps straight onto the while_ method, so the
+        old Tree-unwrapping and while special case are gone.
         """
         for item in items:
-            if hasattr(item, 'children') and len(item.children) > 0:
-                func = item.children[0]
-                if callable(func):
-                    try:
-                        func()
-                    except Exception as e:
-                        self._print(f"Error executing statement: {e}")
-                elif hasattr(func, 'data') and func.data == 'while':
-                    # handle while loops specially
-                    try:
-                        while_func = self.while_(func.children)
-                        while_func()
-                    except Exception as e:
-                        self._print(f"Error executing while loop: {e}")
-            elif callable(item):
-                try:
-                    item()
-                except Exception as e:
-                    self._print(f"Error executing statement: {e}")
+            try:
+                item()
+            except Exception as e:
+                self._print(f"Error executing statement: {e}")
         return items
 
     # ========== literals / terminals ==========
 
     def STRING(self, token):
-        # Return a callable that yields the string contents without quotes.
-        return lambda: str(token)[1:-1]
+        # Raw value: evaluate() passes plain literals straight through.
+        return str(token)[1:-1]
 
     def NUMBER(self, token):
         token_str = str(token)
         try:
             if '.' in token_str:
-                value = float(token_str)
-            else:
-                value = int(token_str)
+                return float(token_str)
+            return int(token_str)
         except ValueError:
-            value = 0
-        return lambda: value
+            return 0
 
     def WORD(self, token):
-        return str(token)
+        name = str(token)
+        var = _VAR_CACHE.get(name)
+        if var is None:
+            var = _VAR_CACHE[name] = _Var(name)
+        return var
 
     # ========== assignments, display, input ==========
 
     def assignment(self, items):
         varname, value = items
+        # local aliases: LOAD_FAST inside the closure instead of
+        # attribute lookups on self at every call
+        variables = self.vars
+        ev = self.evaluate
         def assign():
-            new_value = self.evaluate(value)
-            self.vars[varname] = new_value
+            variables[varname] = ev(value)
         return assign
 
     def display(self, items):
         expr = items[0]
-        return lambda: self._print(self.evaluate(expr))
+        write = self._stdout.write
+        ev = self.evaluate
+        return lambda: write(str(ev(expr)) + '\n')
 
     def input(self, items):
         """
@@ -275,12 +721,11 @@ class CorvoInterpreter(Transformer):
     # ========== conditionals ==========
 
     def if_only(self, items):
-        condition_tree, statement_tree = items
-        condition = condition_tree.children[0] if hasattr(condition_tree, 'children') else condition_tree
-        stmt = statement_tree.children[0] if hasattr(statement_tree, 'children') else statement_tree
+        # grammar inlining (?statement/?condition) guarantees both
+        # items arrive as closures, with no wrapper Tree to strip
+        condition, stmt = items
         def run():
-            cond_result = self.evaluate(condition)
-            if cond_result:
+            if self.evaluate(condition):
                 stmt()
         return run
 
@@ -297,28 +742,14 @@ class CorvoInterpreter(Transformer):
 
         def run():
             if self.evaluate(condition):
-                # execute "then" branch
-                if hasattr(then_stmt, 'children') and len(then_stmt.children) > 0:
-                    stmt_func = then_stmt.children[0]
-                    if callable(stmt_func):
-                        stmt_func()
-                elif callable(then_stmt):
-                    then_stmt()
+                then_stmt()
             else:
-                # execute "else" branch
-                if hasattr(else_stmt, 'children') and len(else_stmt.children) > 0:
-                    stmt_func = else_stmt.children[0]
-                    if callable(stmt_func):
-                        stmt_func()
-                elif callable(else_stmt):
-                    else_stmt()
+                else_stmt()
         return run
 
     def if_only_block(self, items):
-        condition_tree = items[0]
-        statement_trees = items[1:]
-        condition = condition_tree.children[0] if hasattr(condition_tree, 'children') else condition_tree
-        block = [tree.children[0] if hasattr(tree, 'children') else tree for tree in statement_trees]
+        condition = items[0]
+        block = items[1:]
         def run():
             if self.evaluate(condition):
                 for stmt in block:
@@ -334,162 +765,122 @@ class CorvoInterpreter(Transformer):
                 break
 
         if otherwise_index == -1:
-            # if-without-else
-            condition_tree = items[0]
-            statement_trees = items[1:]
-            condition = condition_tree.children[0] if hasattr(condition_tree, 'children') else condition_tree
-            block = [tree.children[0] if hasattr(tree, 'children') else tree for tree in statement_trees]
-            def run():
-                if self.evaluate(condition):
-                    for stmt in block:
-                        stmt()
-            return run
-        else:
-            # if ... otherwise ...
-            condition = items[0]
-            then_statements = items[1:otherwise_index]
-            else_statements = items[otherwise_index + 1:]
-
-            then_block = []
-            for stmt_tree in then_statements:
-                if hasattr(stmt_tree, 'children') and len(stmt_tree.children) > 0:
-                    then_block.append(stmt_tree.children[0])
-                else:
-                    then_block.append(stmt_tree)
+            return self.if_only_block(items)
 
-            else_block = []
-            for stmt_tree in else_statements:
-                if hasattr(stmt_tree, 'children') and len(stmt_tree.children) > 0:
-                    else_block.append(stmt_tree.children[0])
-                else:
-                    else_block.append(stmt_tree)
+        condition = items[0]
+        then_block = items[1:otherwise_index]
+        else_block = items[otherwise_index + 1:]
 
-            def run():
-                if self.evaluate(condition):
-                    for stmt in then_block:
-                        if callable(stmt):
-                            stmt()
-                else:
-                    for stmt in else_block:
-                        if callable(stmt):
-                            stmt()
-            return run
+        def run():
+            if self.evaluate(condition):
+                for stmt in then_block:
+                    stmt()
+            else:
+                for stmt in else_block:
+                    stmt()
+        return run
 
     # ========== boolean / comparisons ==========
 
     def and_(self, items):
-        left_tree, and_token, right_tree = items
-        left = left_tree.children[0] if hasattr(left_tree, 'children') else left_tree
-        right = right_tree.children[0] if hasattr(right_tree, 'children') else right_tree
+        left, and_token, right = items
         def cond():
             return self.evaluate(left) and self.evaluate(right)
         return cond
 
     def or_(self, items):
-        left_tree, or_token, right_tree = items
-        left = left_tree.children[0] if hasattr(left_tree, 'children') else left_tree
-        right = right_tree.children[0] if hasattr(right_tree, 'children') else right_tree
+        left, or_token, right = items
         def cond():
             return self.evaluate(left) or self.evaluate(right)
         return cond
 
     def base_condition(self, items):
         left, op, right = items
-        def cond():
-            l_val = self.evaluate(left)
-            r_val = self.evaluate(right)
-
-            if hasattr(op, 'children') and len(op.children) > 0:
-                op_str = op.children[0]
+        if hasattr(op, 'children') and len(op.children) > 0:
+            op = op.children[0]
+        op_fn = _OPS.get(op)
+        if op_fn is None:
+            return lambda: False
+        if _is_literal(left) and _is_literal(right):
+            try:
+                value = op_fn(left, right)
+            except TypeError:
+                pass  # mixed types: keep the runtime comparison
             else:
-                op_str = op
-
-            if op_str == "is equal to":
-                result = l_val == r_val
-            elif op_str == "is greater than":
-                result = l_val > r_val
-            elif op_str == "is less than":
-                result = l_val < r_val
-            else:
-                result = False
-
-            return result
-        return cond
+                return lambda: value
+        ev = self.evaluate
+        return lambda: op_fn(ev(left), ev(right))
 
     def IS_EQUAL_TO(self, token):
-        return "is equal to"
+        return _IS_EQUAL_TO
 
     def IS_GREATER_THAN(self, token):
-        return "is greater than"
+        return _IS_GREATER_THAN
 
     def IS_LESS_THAN(self, token):
-        return "is less than"
+        return _IS_LESS_THAN
 
     # ========== loops ==========
 
+    @staticmethod
+    def _coerce_times(times_val):
+        if isinstance(times_val, str):
+            try:
+                return int(times_val)
+            except ValueError:
+                return 0
+        return times_val
+
     def repeat_single(self, items):
-        times_tree, loops_token, stmt_tree = items
-        times = times_tree.children[0] if hasattr(times_tree, 'children') else times_tree
-        stmt = stmt_tree.children[0] if hasattr(stmt_tree, 'children') else stmt_tree
+        times, loops_token, stmt = items
+        if isinstance(times, int):
+            # literal count: resolve the range once at build time
+            def run():
+                for _ in range(times):
+                    stmt()
+            return run
+        ev = self.evaluate
+        coerce = self._coerce_times
         def run():
-            times_val = self.evaluate(times)
-            if isinstance(times_val, str):
-                try:
-                    times_val = int(times_val)
-                except ValueError:
-                    times_val = 0
-            for _ in range(times_val):
+            for _ in range(coerce(ev(times))):
                 stmt()
         return run
 
     def repeat_block(self, items):
-        times_tree = items[0]
+        times = items[0]
         # items[1] is e.g. "loops"
-        statement_trees = items[2:]
-        times = times_tree.children[0] if hasattr(times_tree, 'children') else times_tree
-        block = [tree.children[0] if hasattr(tree, 'children') else tree for tree in statement_trees]
+        block = items[2:]
 
+        if isinstance(times, int):
+            def run():
+                for _ in range(times):
+                    for stmt in block:
+                        stmt()
+            return run
+        ev = self.evaluate
+        coerce = self._coerce_times
         def run():
-            times_val = self.evaluate(times)
-            if isinstance(times_val, str):
-                try:
-                    times_val = int(times_val)
-                except ValueError:
-                    times_val = 0
-
-            for _ in range(times_val):
+            for _ in range(coerce(ev(times))):
                 for stmt in block:
-                    if callable(stmt):
-                        stmt()
+                    stmt()
         return run
 
     def while_(self, items):
-        # items: [while_token, condition_tree, do_token, ...block...]
-        condition_tree = items[1]
-        statement_trees = items[3:]
-        block = []
-        for stmt_tree in statement_trees:
-            if hasattr(stmt_tree, 'children') and len(stmt_tree.children) > 0:
-                block.append(stmt_tree.children[0])
-            else:
-                block.append(stmt_tree)
+        # items: [while_token, condition, do_token, ...block...]
+        condition = items[1]
+        block = items[3:]
+        ev = self.evaluate
+        max_iter = self._max_loop_iterations
 
         def run():
-            max_iter = self._max_loop_iterations
             iterations = 0
 
             while iterations < max_iter:
-                condition_func = condition_tree
-                if hasattr(condition_tree, 'children') and len(condition_tree.children) > 0:
-                    condition_func = condition_tree.children[0]
-
-                condition_result = self.evaluate(condition_func)
-                if not condition_result:
+                if not ev(condition):
                     break
 
                 for stmt in block:
-                    if callable(stmt):
-                        stmt()
+                    stmt()
 
                 iterations += 1
 
@@ -498,32 +889,20 @@ class CorvoInterpreter(Transformer):
         return run
 
     def for_loop(self, items):
-        # You support both:
-        #   for each item in list : [ ... ]
-        # and a slightly looser variant
-        if len(items) >= 6:
-            var = items[2]
-            list_name = items[4]
-            statement_trees = items[6:]
-        else:
-            var = items[0]
-            list_name = items[1]
-            statement_trees = items[2:]
-
-        block = []
-        for stmt_tree in statement_trees:
-            if hasattr(stmt_tree, 'children') and len(stmt_tree.children) > 0:
-                block.append(stmt_tree.children[0])
-            else:
-                block.append(stmt_tree)
+        # items: [var, list_name, ...block...]; the old dual-layout
+        # guess (len >= 6 meant keyword tokens present) misread any
+        # loop with four or more body statements
+        var = items[0]
+        list_name = items[1]
+        block = items[2:]
+        variables = self.vars
 
         def run():
-            lst = self.vars.get(list_name, [])
+            lst = variables.get(list_name, [])
             for item in lst:
-                self.vars[var] = item
+                variables[var] = item
                 for stmt in block:
-                    if callable(stmt):
-                        stmt()
+                    stmt()
         return run
 
     # ========== file / CSV features (stubbed for browser) ==========
@@ -566,53 +945,81 @@ class CorvoInterpreter(Transformer):
     def section_def(self, items):
         section_token = items[0]
         name_func = items[1]
-        statement_trees = items[2:]
-
-        block = []
-        for tree in statement_trees:
-            if hasattr(tree, 'children') and len(tree.children) > 0:
-                block.append(tree.children[0])
-            else:
-                block.append(tree)
+        block = items[2:]
 
         name = self.evaluate(name_func) if callable(name_func) else name_func
         self.sections[name] = block
         return lambda: None
 
     def section_call(self, items):
-        name_func = items[0]
+        # WORD is already a plain string key, so the name needs no
+        # evaluation; the block list is looked up once on first call
+        # and cached (sections register during transform, before any
+        # statement runs)
+        name = str(items[0])
+        sections = self.sections
+        cache = [None]
         def run():
-            name = self.evaluate(name_func) if callable(name_func) else name_func
-            if name in self.sections:
-                for stmt in self.sections[name]:
-                    stmt()
-            else:
-                self._print(f"(Error: Section '{name}' not defined.)")
+            block = cache[0]
+            if block is None:
+                block = sections.get(name)
+                if block is None:
+                    self._print(f"(Error: Section '{name}' not defined.)")
+                    return
+                cache[0] = block
+            for stmt in block:
+                stmt()
         return run
 
     # ========== lists, arithmetic, indexing ==========
 
     def list_append(self, items):
         item, list_name = items
+        variables = self.vars
+        ev = self.evaluate
+        # cache the list identity and its bound append so the steady
+        # state is one dict get and one method call per append; the
+        # sentinel keeps an unset variable (None) from matching the
+        # empty cache
+        cache = [_UNSET, None]
         def append_item():
-            if list_name not in self.vars:
-                self.vars[list_name] = []
-            if isinstance(self.vars[list_name], list):
-                self.vars[list_name].append(self.evaluate(item))
+            lst = variables.get(list_name)
+            if lst is cache[0]:
+                cache[1](ev(item))
+                return
+            if lst is None:
+                lst = []
+                variables[list_name] = lst
+            if isinstance(lst, list):
+                cache[0] = lst
+                cache[1] = lst.append
+                cache[1](ev(item))
         return append_item
 
     def list_remove(self, items):
         item, list_name = items
+        variables = self.vars
+        ev = self.evaluate
+        cache = [_UNSET, None]
         def remove_item():
-            if list_name in self.vars and isinstance(self.vars[list_name], list):
-                try:
-                    self.vars[list_name].remove(self.evaluate(item))
-                except ValueError:
-                    pass
+            lst = variables.get(list_name)
+            if lst is not cache[0]:
+                if not isinstance(lst, list):
+                    return
+                cache[0] = lst
+                cache[1] = lst.remove
+            try:
+                cache[1](ev(item))
+            except ValueError:
+                pass
         return remove_item
 
     def list(self, items):
-        return lambda: [self.evaluate(item) for item in items]
+        # "[]" parses with a single None placeholder; drop it so an
+        # empty list really is empty, matching the bytecode compiler
+        items = [item for item in items if item is not None]
+        ev = self.evaluate
+        return lambda: [ev(item) for item in items]
 
     def length(self, items):
         _, expr = items
@@ -620,54 +1027,58 @@ class CorvoInterpreter(Transformer):
 
     def count(self, items):
         _, varname = items
-        return lambda: len(self.vars.get(varname, []))
+        variables = self.vars
+        return lambda: len(variables.get(varname, []))
+
+    @staticmethod
+    def _concat_values(left_val, right_val):
+        # coerce numeric strings so "5 plus 7" = 12; one compiled
+        # regex match per operand instead of two string copies and
+        # a digit scan
+        if isinstance(left_val, str) and _NUM_RE(left_val):
+            left_val = float(left_val) if '.' in left_val else int(left_val)
+
+        if isinstance(right_val, str) and _NUM_RE(right_val):
+            right_val = float(right_val) if '.' in right_val else int(right_val)
+
+        if isinstance(left_val, (int, float)) and isinstance(right_val, (int, float)):
+            return left_val + right_val
+        else:
+            return str(left_val) + str(right_val)
 
     def concat(self, items):
         left, plus_token, right = items
-        def operation():
-            left_val = self.evaluate(left)
-            right_val = self.evaluate(right)
-
-            # try to coerce numeric strings so "5 plus 7" = 12
-            if isinstance(left_val, str) and left_val.replace('.', '').replace('-', '').isdigit():
-                try:
-                    left_val = float(left_val) if '.' in left_val else int(left_val)
-                except ValueError:
-                    pass
-
-            if isinstance(right_val, str) and right_val.replace('.', '').replace('-', '').isdigit():
-                try:
-                    right_val = float(right_val) if '.' in right_val else int(right_val)
-                except ValueError:
-                    pass
-
-            if isinstance(left_val, (int, float)) and isinstance(right_val, (int, float)):
-                return left_val + right_val
-            else:
-                return str(left_val) + str(right_val)
-        return operation
+        if _is_literal(left) and _is_literal(right):
+            # both operands known at build time: fold to a raw value,
+            # which downstream handlers treat like any other literal
+            # (a folded loop count keeps repeat's build-time range)
+            return self._concat_values(left, right)
+        ev = self.evaluate
+        combine = self._concat_values
+        return lambda: combine(ev(left), ev(right))
 
     def subtract(self, items):
         left, minus_token, right = items
-        def operation():
-            left_val = self.evaluate(left)
-            right_val = self.evaluate(right)
-            return left_val - right_val
-        return operation
+        if type(left) in (int, float) and type(right) in (int, float):
+            return left - right
+        ev = self.evaluate
+        return lambda: ev(left) - ev(right)
 
     def multiply(self, items):
         left, times_token, right = items
-        def operation():
-            left_val = self.evaluate(left)
-            right_val = self.evaluate(right)
-            return left_val * right_val
-        return operation
+        if type(left) in (int, float) and type(right) in (int, float):
+            return left * right
+        ev = self.evaluate
+        return lambda: ev(left) * ev(right)
 
     def divide(self, items):
         left, divided_by_token, right = items
+        if type(left) in (int, float) and type(right) in (int, float) and right != 0:
+            return left / right
+        ev = self.evaluate
         def operation():
-            left_val = self.evaluate(left)
-            right_val = self.evaluate(right)
+            left_val = ev(left)
+            right_val = ev(right)
             if right_val == 0:
                 self._print("(Error: Division by zero)")
                 return 0
@@ -676,10 +1087,28 @@ class CorvoInterpreter(Transformer):
 
     def index_access(self, items):
         varname_func, at_token, index = items
+        variables = self.vars
+        ev = self.evaluate
+        if type(varname_func) is _Var and type(index) is int and index >= 1:
+            # constant int index on a named list: no coercion and no
+            # name evaluation at runtime, just bounds-check and fetch
+            idx0 = index - 1
+            def get_item():
+                lst = variables.get(varname_func)
+                if isinstance(lst, list):
+                    if idx0 < len(lst):
+                        return lst[idx0]
+                    self._print(f"(Error: Index {index} out of range"
+                                f" for list '{varname_func}'.)")
+                    return ""
+                self._print(f"(Error: {varname_func} is not a list.)")
+                return ""
+            return get_item
+
         def get_item():
-            varname = self.evaluate(varname_func) if callable(varname_func) else varname_func
-            lst = self.vars.get(varname)
-            idx = self.evaluate(index)
+            varname = ev(varname_func) if callable(varname_func) else varname_func
+            lst = variables.get(varname)
+            idx = ev(index)
 
             if isinstance(idx, str):
                 try:
@@ -700,31 +1129,860 @@ class CorvoInterpreter(Transformer):
         return get_item
 
 
+# -------------------------------------------------
+# 2. Bytecode compiler and virtual machine
+# -------------------------------------------------
+# Mirrors the desktop corvo_vm: the parse tree is lowered once into a
+# flat list of (opcode, argument) tuples and executed by one dispatch
+# loop over a handler table, instead of walking a tree of closures
+# that re-checks shapes on every operand. Browser differences are the
+# same as in the Transformer above: output goes to a buffer, input and
+# file/CSV operations are stubbed, and the while cap warns in browser
+# wording. The Transformer remains as a fallback for anything the
+# compiler cannot lower.
+
+_LOAD_CONST = 0    # push consts[arg]
+_LOAD_VAR = 1      # push vars[arg] (slot), or the name itself if unset
+_STORE_VAR = 2     # vars[arg] = pop
+_ADD = 3           # push pop + pop  (numeric or string concat)
+_SUB = 4
+_MUL = 5
+_DIV = 6
+_CMP_EQ = 7
+_CMP_GT = 8
+_CMP_LT = 9
+_JMP_IF_FALSE_OR_POP = 10  # short-circuit 'and'
+_JMP_IF_TRUE_OR_POP = 11   # short-circuit 'or'
+_JMP = 12
+_JMP_IF_FALSE = 13
+_POP = 14
+_DISPLAY = 15      # buffer str(pop)
+_INPUT_STUB = 16   # vars[arg] = "" (no interactive input in browser)
+_BUILD_LIST = 17
+_LENGTH = 18
+_COUNT = 19
+_INDEX = 20
+_COLUMN_STUB = 21  # push [] (no persistent CSV tables in browser)
+_APPEND = 22
+_REMOVE = 23
+_WRITE_STUB = 24   # filename = pop, report skip
+_READ_STUB = 25
+_CSV_READ_STUB = 26
+_CSV_WRITE_STUB = 27
+_CSV_SET_STUB = 28
+_CALL_SECTION = 29
+_TO_INT = 30
+_REPEAT_TEST = 31
+_FOR_ITER = 32
+_RETURN = 33
+_SECTION_MISSING = 34
+_RUN_NATIVE = 35    # run a lifted loop body: arg(vars, names, out, pop())
+
+# marks a variable slot that has never been assigned
+_UNSET = object()
+
+
+class _CompileError(Exception):
+    """Raised when the compiler meets a tree shape it cannot lower."""
+    pass
+
+
+class _Code:
+    """A compiled browser program: instructions, constants, sections."""
+
+    def __init__(self, code, consts, sections, boundaries, names):
+        self.code = code
+        self.consts = consts
+        self.sections = sections
+        self.boundaries = boundaries  # start offsets of each statement
+        self.names = names            # variable slot -> source name
+
+
+class _Compiler:
+    """Walks the Lark parse tree once and emits flat bytecode."""
+
+    def __init__(self):
+        self.code = []
+        self.consts = []
+        self.sections = {}
+        self.symtab = {}
+        self.pending_calls = []
+        self.const_index = {}
+
+    def slot(self, name):
+        name = str(name)
+        if name not in self.symtab:
+            self.symtab[name] = len(self.symtab)
+        return self.symtab[name]
+
+    def const(self, value):
+        # dedup by type as well as value: 1 == 1.0 (and (1, 2) == (1.0, 2))
+        # but the pair must not share a pool slot
+        if type(value) is tuple:
+            key = (tuple, tuple((type(v), v) for v in value))
+        else:
+            key = (type(value), value)
+        index = self.const_index.get(key)
+        if index is None:
+            index = self.const_index[key] = len(self.consts)
+            self.consts.append(value)
+        return index
+
+    def emit(self, op, arg=None):
+        self.code.append((op, arg))
+        return len(self.code) - 1
+
+    def patch(self, at, target):
+        op, _ = self.code[at]
+        self.code[at] = (op, target)
+
+    def unwrap(self, node):
+        while (hasattr(node, 'data') and str(node.data) in
+                ('statement', 'simple_statement', 'expr', 'condition',
+                 'comparator')
+                and len(node.children) == 1):
+            node = node.children[0]
+        return node
+
+    def subtrees(self, items):
+        return [item for item in items
+                if hasattr(item, 'data') or getattr(item, 'type', None)
+                in ('WORD', 'STRING', 'NUMBER')]
+
+    def compile_program(self, tree):
+        boundaries = []
+        for stmt in tree.children:
+            boundaries.append(len(self.code))
+            self.statement(stmt)
+        for at in self.pending_calls:
+            op, name = self.code[at]
+            if name in self.sections:
+                self.code[at] = (_CALL_SECTION, self.sections[name])
+            else:
+                self.code[at] = (_SECTION_MISSING, name)
+        return _Code(self.code, self.consts, self.sections, boundaries,
+                     tuple(self.symtab))
+
+    def statement(self, node):
+        node = self.unwrap(node)
+        if not hasattr(node, 'data'):
+            self.pending_calls.append(self.emit(_CALL_SECTION, str(node)))
+            return
+        name = str(node.data)
+        method = getattr(self, 'c_' + name, None)
+        if method is None:
+            raise _CompileError(f"Cannot compile statement '{name}'")
+        method(node.children)
+
+    def expr(self, node):
+        node = self.unwrap(node)
+        if not hasattr(node, 'data'):
+            token_type = getattr(node, 'type', None)
+            if token_type == 'STRING':
+                self.emit(_LOAD_CONST, self.const(str(node)[1:-1]))
+            elif token_type == 'NUMBER':
+                text = str(node)
+                value = float(text) if '.' in text else int(text)
+                self.emit(_LOAD_CONST, self.const(value))
+            else:
+                self.emit(_LOAD_VAR, self.slot(node))
+            return
+        name = str(node.data)
+        if name == 'concat':
+            left, right = self.subtrees(node.children)
+            self.expr(left)
+            self.expr(right)
+            self.emit(_ADD)
+        elif name in ('subtract', 'multiply', 'divide'):
+            left, right = self.subtrees(node.children)
+            self.expr(left)
+            self.expr(right)
+            self.emit({'subtract': _SUB, 'multiply': _MUL,
+                       'divide': _DIV}[name])
+        elif name == 'list':
+            children = [c for c in node.children if c is not None]
+            for child in children:
+                self.expr(child)
+            self.emit(_BUILD_LIST, len(children))
+        elif name == 'length':
+            self.expr(self.subtrees(node.children[1:])[0])
+            self.emit(_LENGTH)
+        elif name == 'count':
+            self.emit(_COUNT, self.slot(node.children[-1]))
+        elif name == 'index_access':
+            varslot = self.slot(node.children[0])
+            self.expr(node.children[-1])
+            self.emit(_INDEX, varslot)
+        elif name == 'column_access':
+            self.emit(_COLUMN_STUB)
+        else:
+            raise _CompileError(f"Cannot compile expression '{name}'")
+
+    def condition(self, node):
+        node = self.unwrap(node)
+        name = str(node.data)
+        if name == 'base_condition':
+            left, op, right = node.children
+            self.expr(left)
+            self.expr(right)
+            op = self.unwrap(op)
+            op_type = getattr(op, 'type', str(op))
+            self.emit({'IS_EQUAL_TO': _CMP_EQ,
+                       'IS_GREATER_THAN': _CMP_GT,
+                       'IS_LESS_THAN': _CMP_LT}[op_type])
+        elif name in ('and_', 'or_'):
+            left, _, right = node.children
+            self.condition(left)
+            jump = self.emit(_JMP_IF_FALSE_OR_POP if name == 'and_'
+                             else _JMP_IF_TRUE_OR_POP)
+            self.condition(right)
+            self.patch(jump, len(self.code))
+        else:
+            raise _CompileError(f"Cannot compile condition '{name}'")
+
+    def c_assignment(self, items):
+        varname, value = items
+        self.expr(value)
+        self.emit(_STORE_VAR, self.slot(varname))
+
+    def c_display(self, items):
+        self.expr(items[0])
+        self.emit(_DISPLAY)
+
+    def c_input(self, items):
+        # no interactive input in the browser; the prompt is not shown
+        self.emit(_INPUT_STUB, self.slot(items[-1]))
+
+    def c_if_only(self, items):
+        condition, stmt = items
+        self.condition(condition)
+        jump = self.emit(_JMP_IF_FALSE)
+        self.statement(stmt)
+        self.patch(jump, len(self.code))
+
+    def c_if_else(self, items):
+        condition, then_stmt, else_stmt = self.subtrees(items)
+        self.condition(condition)
+        jump_else = self.emit(_JMP_IF_FALSE)
+        self.statement(then_stmt)
+        jump_end = self.emit(_JMP)
+        self.patch(jump_else, len(self.code))
+        self.statement(else_stmt)
+        self.patch(jump_end, len(self.code))
+
+    def c_if_only_block(self, items):
+        self.condition(items[0])
+        jump = self.emit(_JMP_IF_FALSE)
+        for stmt in items[1:]:
+            self.statement(stmt)
+        self.patch(jump, len(self.code))
+
+    def c_if_else_block(self, items):
+        otherwise_index = -1
+        for i, item in enumerate(items):
+            if getattr(item, 'type', None) == 'OTHERWISE':
+                otherwise_index = i
+                break
+        if otherwise_index == -1:
+            self.c_if_only_block(items)
+            return
+        self.condition(items[0])
+        jump_else = self.emit(_JMP_IF_FALSE)
+        for stmt in items[1:otherwise_index]:
+            self.statement(stmt)
+        jump_end = self.emit(_JMP)
+        self.patch(jump_else, len(self.code))
+        for stmt in items[otherwise_index + 1:]:
+            self.statement(stmt)
+        self.patch(jump_end, len(self.code))
+
+    def c_repeat_single(self, items):
+        times, _, stmt = items
+        self.compile_repeat(times, [stmt])
+
+    def c_repeat_block(self, items):
+        self.compile_repeat(items[0], items[2:])
+
+    # opcodes a lifted repeat body may contain: straight-line
+    # arithmetic over variables and constants, nothing with I/O,
+    # control flow or lists
+    _LIFTABLE = frozenset((_LOAD_CONST, _LOAD_VAR, _STORE_VAR,
+                           _ADD, _SUB, _MUL, _DIV))
+
+    def compile_repeat(self, times, body):
+        self.expr(times)
+        self.emit(_TO_INT)
+        start = len(self.code)
+        pending = len(self.pending_calls)
+        sections = dict(self.sections)
+        for stmt in body:
+            self.statement(stmt)
+        native = self.lift_loop(self.code[start:])
+        # roll the probe pass back either way; the non-lifted path
+        # re-emits the body inside the loop skeleton below
+        del self.code[start:]
+        del self.pending_calls[pending:]
+        self.sections = sections
+        if native is not None:
+            # replace the whole loop with one opcode running the
+            # generated function; the VM never dispatches the body
+            self.emit(_RUN_NATIVE, native)
+            return
+        top = len(self.code)
+        test = self.emit(_REPEAT_TEST)
+        for stmt in body:
+            self.statement(stmt)
+        self.emit(_JMP, top)
+        self.patch(test, len(self.code))
+
+    def lift_loop(self, region):
+        """Translate a pure-arithmetic loop body into one generated
+        Python function f(vars, names, out, n), or return None.
+
+        Running the body as real Python removes all per-iteration
+        opcode dispatch; variables live in locals for the duration of
+        the loop and are written back once at the end.
+        """
+        if not region:
+            return None
+        if any(op not in self._LIFTABLE for op, _ in region):
+            return None
+        stack = []
+        lines = []
+        used = set()
+        stored = set()
+        for op, arg in region:
+            if op == _LOAD_CONST:
+                value = self.consts[arg]
+                if not isinstance(value, (int, float)):
+                    return None
+                stack.append(repr(value))
+            elif op == _LOAD_VAR:
+                used.add(arg)
+                stack.append(f"v{arg}")
+            elif op == _STORE_VAR:
+                used.add(arg)
+                stored.add(arg)
+                lines.append(f"v{arg} = {stack.pop()}")
+            else:
+                right = stack.pop()
+                left = stack.pop()
+                if op == _ADD:
+                    stack.append(f"_add({left}, {right})")
+                elif op == _SUB:
+                    stack.append(f"({left} - {right})")
+                elif op == _MUL:
+                    stack.append(f"({left} * {right})")
+                else:
+                    stack.append(f"_div(out, {left}, {right})")
+        if stack or not lines:
+            return None
+        src = ["def _hot(vars, names, out, n):"]
+        for slot in sorted(used):
+            src.append(f"    v{slot} = vars[{slot}]")
+            src.append(f"    if v{slot} is _UNSET: v{slot} = names[{slot}]")
+        # write back in a finally so stores from completed iterations
+        # survive a mid-loop error, like the non-lifted path
+        src.append("    try:")
+        src.append("        for _ in range(n):")
+        for line in lines:
+            src.append("            " + line)
+        src.append("    finally:")
+        for slot in sorted(stored):
+            src.append(f"        vars[{slot}] = v{slot}")
+        namespace = {'_UNSET': _UNSET, '_add': _browser_add,
+                     '_div': _browser_div}
+        exec("\n".join(src), namespace)
+        return namespace['_hot']
+
+    def c_while_(self, items):
+        condition = items[1]
+        body = items[3:]
+        # budget counter keeps the iteration safety cap
+        self.emit(_LOAD_CONST, self.const(10000))
+        top = len(self.code)
+        test = self.emit(_REPEAT_TEST)
+        self.condition(condition)
+        jump_done = self.emit(_JMP_IF_FALSE)
+        for stmt in body:
+            self.statement(stmt)
+        self.emit(_JMP, top)
+        self.patch(test, len(self.code))
+        self.emit(_LOAD_CONST, self.const(
+            "(Warning: While loop stopped after max iterations)"))
+        self.emit(_DISPLAY)
+        jump_end = self.emit(_JMP)
+        self.patch(jump_done, len(self.code))
+        self.emit(_POP)  # discard the unused loop budget
+        self.patch(jump_end, len(self.code))
+
+    def c_for_loop(self, items):
+        trees = [item for item in items
+                 if getattr(item, 'type', None) == 'WORD'
+                 or hasattr(item, 'data')]
+        var = self.slot(trees[0])
+        list_name = self.slot(trees[1])
+        body = trees[2:]
+        self.emit(_LOAD_VAR, list_name)
+        self.emit(_LOAD_CONST, self.const(0))
+        top = len(self.code)
+        iter_instr = self.emit(_FOR_ITER)
+        self.emit(_STORE_VAR, var)
+        for stmt in body:
+            self.statement(stmt)
+        self.emit(_JMP, top)
+        self.patch(iter_instr, len(self.code))
+
+    def c_list_append(self, items):
+        item, list_name = items
+        self.expr(item)
+        self.emit(_APPEND, self.slot(list_name))
+
+    def c_list_remove(self, items):
+        item, list_name = items
+        self.expr(item)
+        self.emit(_REMOVE, self.slot(list_name))
+
+    def c_write(self, items):
+        content, filename = items
+        self.expr(filename)
+        self.emit(_WRITE_STUB)
+
+    def c_read(self, items):
+        self.emit(_READ_STUB)
+
+    def c_csv_read(self, items):
+        self.emit(_CSV_READ_STUB)
+
+    def c_csv_write(self, items):
+        self.emit(_CSV_WRITE_STUB)
+
+    def c_csv_set(self, items):
+        self.emit(_CSV_SET_STUB)
+
+    def c_section_def(self, items):
+        trees = self.subtrees(items)
+        name = str(trees[0])
+        skip = self.emit(_JMP)
+        self.sections[name] = len(self.code)
+        for stmt in trees[1:]:
+            self.statement(stmt)
+        self.emit(_RETURN)
+        self.patch(skip, len(self.code))
+
+    def c_section_call(self, items):
+        self.pending_calls.append(self.emit(_CALL_SECTION, str(items[0])))
+
+
+def _browser_add(left, right):
+    """'plus' semantics: numeric addition when both sides look numeric,
+    string concatenation otherwise."""
+    if isinstance(left, str) and _NUM_RE(left):
+        left = float(left) if '.' in left else int(left)
+    if isinstance(right, str) and _NUM_RE(right):
+        right = float(right) if '.' in right else int(right)
+    if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+        return left + right
+    return str(left) + str(right)
+
+
+def _browser_div(out, left, right):
+    """'divided by' semantics including the division-by-zero message."""
+    if right == 0:
+        out.append("(Error: Division by zero)")
+        return 0
+    return left / right
+
+
+# Each opcode gets one small handler taking (vm, stack, arg, pc) and
+# returning the next pc, so the VM loop is a single dispatch site.
+
+def _h_load_const(vm, stack, arg, pc):
+    stack.append(vm.consts[arg])
+    return pc
+
+
+def _h_load_var(vm, stack, arg, pc):
+    value = vm.vars[arg]
+    stack.append(vm.names[arg] if value is _UNSET else value)
+    return pc
+
+
+def _h_store_var(vm, stack, arg, pc):
+    vm.vars[arg] = stack.pop()
+    return pc
+
+
+def _h_add(vm, stack, arg, pc):
+    right = stack.pop()
+    stack.append(_browser_add(stack.pop(), right))
+    return pc
+
+
+def _h_sub(vm, stack, arg, pc):
+    right = stack.pop()
+    stack.append(stack.pop() - right)
+    return pc
+
+
+def _h_mul(vm, stack, arg, pc):
+    right = stack.pop()
+    stack.append(stack.pop() * right)
+    return pc
+
+
+def _h_div(vm, stack, arg, pc):
+    right = stack.pop()
+    stack.append(_browser_div(vm.out, stack.pop(), right))
+    return pc
+
+
+def _h_cmp_eq(vm, stack, arg, pc):
+    right = stack.pop()
+    stack.append(stack.pop() == right)
+    return pc
+
+
+def _h_cmp_gt(vm, stack, arg, pc):
+    right = stack.pop()
+    stack.append(stack.pop() > right)
+    return pc
+
+
+def _h_cmp_lt(vm, stack, arg, pc):
+    right = stack.pop()
+    stack.append(stack.pop() < right)
+    return pc
+
+
+def _h_jmp_if_false_or_pop(vm, stack, arg, pc):
+    if stack[-1]:
+        stack.pop()
+        return pc
+    return arg
+
+
+def _h_jmp_if_true_or_pop(vm, stack, arg, pc):
+    if stack[-1]:
+        return arg
+    stack.pop()
+    return pc
+
+
+def _h_jmp(vm, stack, arg, pc):
+    return arg
+
+
+def _h_jmp_if_false(vm, stack, arg, pc):
+    return pc if stack.pop() else arg
+
+
+def _h_pop(vm, stack, arg, pc):
+    stack.pop()
+    return pc
+
+
+def _h_display(vm, stack, arg, pc):
+    vm.out.append(str(stack.pop()))
+    return pc
+
+
+def _h_input_stub(vm, stack, arg, pc):
+    vm.vars[arg] = ""
+    return pc
+
+
+def _h_build_list(vm, stack, arg, pc):
+    if arg:
+        items = stack[-arg:]
+        del stack[-arg:]
+    else:
+        items = []
+    stack.append(items)
+    return pc
+
+
+def _h_length(vm, stack, arg, pc):
+    stack.append(len(str(stack.pop())))
+    return pc
+
+
+def _h_count(vm, stack, arg, pc):
+    value = vm.vars[arg]
+    stack.append(0 if value is _UNSET else len(value))
+    return pc
+
+
+def _h_index(vm, stack, arg, pc):
+    stack.append(vm.index_access(arg, stack.pop()))
+    return pc
+
+
+def _h_column_stub(vm, stack, arg, pc):
+    stack.append([])
+    return pc
+
+
+def _h_append(vm, stack, arg, pc):
+    value = stack.pop()
+    lst = vm.vars[arg]
+    if lst is _UNSET:
+        lst = vm.vars[arg] = []
+    if isinstance(lst, list):
+        lst.append(value)
+    return pc
+
+
+def _h_remove(vm, stack, arg, pc):
+    value = stack.pop()
+    lst = vm.vars[arg]
+    if isinstance(lst, list):
+        try:
+            lst.remove(value)
+        except ValueError:
+            pass
+    return pc
+
+
+def _h_write_stub(vm, stack, arg, pc):
+    vm.out.append(f"(File write skipped in browser: {stack.pop()})")
+    return pc
+
+
+def _h_read_stub(vm, stack, arg, pc):
+    vm.out.append("(File read skipped in browser)")
+    return pc
+
+
+def _h_csv_read_stub(vm, stack, arg, pc):
+    vm.out.append("(CSV read skipped in browser)")
+    return pc
+
+
+def _h_csv_write_stub(vm, stack, arg, pc):
+    vm.out.append("(CSV write skipped in browser)")
+    return pc
+
+
+def _h_csv_set_stub(vm, stack, arg, pc):
+    vm.out.append("(CSV cell edit skipped in browser)")
+    return pc
+
+
+def _h_call_section(vm, stack, arg, pc):
+    retstack = vm.retstack
+    if len(retstack) > 1000:
+        raise RecursionError("maximum section recursion depth exceeded")
+    retstack.append(pc)
+    return arg
+
+
+def _h_return(vm, stack, arg, pc):
+    return vm.retstack.pop()
+
+
+def _h_section_missing(vm, stack, arg, pc):
+    vm.out.append(f"(Error: Section '{arg}' not defined.)")
+    return pc
+
+
+def _h_to_int(vm, stack, arg, pc):
+    value = stack.pop()
+    if isinstance(value, str):
+        try:
+            value = int(value)
+        except ValueError:
+            value = 0
+    elif not isinstance(value, int):
+        # don't truncate a float count: the tree-walker's range() call
+        # rejects it, and both engines must error alike
+        raise TypeError(
+            f"'{type(value).__name__}' object cannot be "
+            "interpreted as an integer")
+    stack.append(value)
+    return pc
+
+
+def _h_repeat_test(vm, stack, arg, pc):
+    if stack[-1] <= 0:
+        stack.pop()
+        return arg
+    stack[-1] -= 1
+    return pc
+
+
+def _h_for_iter(vm, stack, arg, pc):
+    i = stack.pop()
+    lst = stack[-1]
+    if not isinstance(lst, list) or i >= len(lst):
+        stack.pop()
+        return arg
+    stack.append(i + 1)
+    stack.append(lst[i])
+    return pc
+
+
+def _h_run_native(vm, stack, arg, pc):
+    arg(vm.vars, vm.names, vm.out, stack.pop())
+    return pc
+
+
+_HANDLERS = [None] * 36
+_HANDLERS[_LOAD_CONST] = _h_load_const
+_HANDLERS[_LOAD_VAR] = _h_load_var
+_HANDLERS[_STORE_VAR] = _h_store_var
+_HANDLERS[_ADD] = _h_add
+_HANDLERS[_SUB] = _h_sub
+_HANDLERS[_MUL] = _h_mul
+_HANDLERS[_DIV] = _h_div
+_HANDLERS[_CMP_EQ] = _h_cmp_eq
+_HANDLERS[_CMP_GT] = _h_cmp_gt
+_HANDLERS[_CMP_LT] = _h_cmp_lt
+_HANDLERS[_JMP_IF_FALSE_OR_POP] = _h_jmp_if_false_or_pop
+_HANDLERS[_JMP_IF_TRUE_OR_POP] = _h_jmp_if_true_or_pop
+_HANDLERS[_JMP] = _h_jmp
+_HANDLERS[_JMP_IF_FALSE] = _h_jmp_if_false
+_HANDLERS[_POP] = _h_pop
+_HANDLERS[_DISPLAY] = _h_display
+_HANDLERS[_INPUT_STUB] = _h_input_stub
+_HANDLERS[_BUILD_LIST] = _h_build_list
+_HANDLERS[_LENGTH] = _h_length
+_HANDLERS[_COUNT] = _h_count
+_HANDLERS[_INDEX] = _h_index
+_HANDLERS[_COLUMN_STUB] = _h_column_stub
+_HANDLERS[_APPEND] = _h_append
+_HANDLERS[_REMOVE] = _h_remove
+_HANDLERS[_WRITE_STUB] = _h_write_stub
+_HANDLERS[_READ_STUB] = _h_read_stub
+_HANDLERS[_CSV_READ_STUB] = _h_csv_read_stub
+_HANDLERS[_CSV_WRITE_STUB] = _h_csv_write_stub
+_HANDLERS[_CSV_SET_STUB] = _h_csv_set_stub
+_HANDLERS[_CALL_SECTION] = _h_call_section
+_HANDLERS[_RETURN] = _h_return
+_HANDLERS[_SECTION_MISSING] = _h_section_missing
+_HANDLERS[_RUN_NATIVE] = _h_run_native
+_HANDLERS[_TO_INT] = _h_to_int
+_HANDLERS[_REPEAT_TEST] = _h_repeat_test
+_HANDLERS[_FOR_ITER] = _h_for_iter
+
+
+class _BrowserVM:
+    """Executes compiled browser bytecode with a single dispatch loop."""
+
+    def __init__(self):
+        self.vars = None
+        self.names = ()
+        self.consts = ()
+        self.retstack = []
+        self.out = []
+
+    def run(self, code_obj):
+        code = code_obj.code
+        if self.vars is None:
+            # one flat slot array shared by the program and its sections
+            self.vars = [_UNSET] * len(code_obj.names)
+            self.names = code_obj.names
+        self.consts = code_obj.consts
+        self.retstack = []
+        handlers = _HANDLERS
+        stack = []
+        pc = 0
+        n = len(code)
+
+        while pc < n:
+            try:
+                while pc < n:
+                    op, arg = code[pc]
+                    pc = handlers[op](self, stack, arg, pc + 1)
+            except Exception as e:
+                self.out.append(f"Error executing statement: {e}")
+                # resume after the top-level statement that failed; a
+                # failure inside a section unwinds to its outermost call
+                if self.retstack:
+                    failed_at = self.retstack[0] - 1
+                    del self.retstack[:]
+                else:
+                    failed_at = pc
+                pc = n
+                for start in code_obj.boundaries:
+                    if start > failed_at:
+                        pc = start
+                        break
+                del stack[:]
+
+    def index_access(self, slot, idx):
+        varname = self.names[slot]
+        lst = self.vars[slot]
+        if lst is _UNSET:
+            lst = None
+        if isinstance(idx, str):
+            try:
+                idx = int(idx)
+            except ValueError:
+                self.out.append(f"(Error: Index '{idx}' is not a valid number.)")
+                return ""
+        if not isinstance(lst, list):
+            self.out.append(f"(Error: {varname} is not a list.)")
+            return ""
+        if not (1 <= idx <= len(lst)):
+            self.out.append(f"(Error: Index {idx} out of range for list '{varname}'.)")
+            return ""
+        return lst[idx - 1]
+
+
 # -------------------------------------------------
 # 2. Public entry point for the browser
 # -------------------------------------------------
 
-def run_corvo(source_code: str):
-    """
-    Run a Corvo program and return (program_output, debug_info).
+@functools.lru_cache(maxsize=16)
+def _compile_source(source_code):
+    """Parse and compile one program, memoized on the source text.
 
-    program_output: text that should show in the "Program Output" panel.
-    debug_info: text that should show in the "Debug" panel.
+    Returns (tree, code_obj); code_obj is None when the bytecode
+    compiler cannot lower the program and the tree-walker must run it.
+    Bytecode and trees are immutable once built - each run gets a
+    fresh VM or interpreter - so reuse across runs is safe. Parse
+    errors propagate and are not cached.
     """
+    tree = _parse_source(source_code)
+    try:
+        code_obj = _Compiler().compile_program(tree)
+    except _CompileError:
+        code_obj = None
+    return tree, code_obj
 
-    # Build parser from embedded grammar. IMPORTANT:
-    # Make sure the start rule name here ('start') matches grammar.lark.
-    parser = Lark(CORVO_GRAMMAR, start='start')
 
-    # Parse Corvo source into a tree
-    tree = parser.parse(source_code)
+def run_corvo(source_code: str, debug: bool = False):
+    """
+    Run a Corvo program and return (program_output, debug_info).
 
-    # Transform+execute using CorvoInterpreter
-    interp = CorvoInterpreter()
-    interp.transform(tree)
+    program_output: text that should show in the "Program Output" panel.
+    debug_info: text that should show in the "Debug" panel. The pretty
+    tree dump walks the whole parse tree, so it is only built when the
+    caller passes debug=True (i.e. the debug panel is actually open).
+    """
 
-    # Gather output and debug info
-    program_output = "\n".join(interp._stdout)
-    debug_info = "Parsed program successfully.\n" + tree.pretty()
+    # Parse and compile, cached: clicking Run repeatedly on the same
+    # source skips both passes after the first time
+    tree, code_obj = _compile_source(source_code)
+
+    # Run on the VM, or fall back to the tree-walking CorvoInterpreter
+    # for any construct the compiler cannot lower yet
+    if code_obj is None:
+        interp = CorvoInterpreter()
+        interp.transform(tree)
+        program_output = interp._stdout.getvalue()
+        if program_output.endswith("\n"):
+            program_output = program_output[:-1]
+    else:
+        vm = _BrowserVM()
+        vm.run(code_obj)
+        program_output = "\n".join(vm.out)
+
+    # Gather debug info
+    if debug:
+        debug_info = "Parsed program successfully.\n" + tree.pretty()
+    else:
+        debug_info = "Parsed program successfully."
 
     return program_output, debug_info
@@ -0,0 +1,1166 @@
+# Corvo Bytecode Compiler and Virtual Machine
+# Copyright (c) 2025 Austin (GitHub: TotoroEmotoro)
+# Licensed under the Corvo Source-Available License, Version 1.0.
+# See the LICENSE file for full license text.
+#
+# This module lowers the Lark parse tree to a flat list of
+# (opcode, argument) instructions and runs them in a single dispatch
+# loop. Compared to the tree-walking interpreter, which rebuilds and
+# re-calls a chain of Python closures on every loop iteration, the VM
+# pays one indexed opcode fetch per operation, which makes hot loops
+# like `repeat ... loops` several times faster.
+#
+# Public API:
+#     compile_tree(tree) -> CodeObject
+#     CorvoVM().run(code) -> None   (prints program output)
+
+import csv
+import re
+
+# matches strings that can be coerced to int/float by the ADD opcode
+_NUM_RE = re.compile(r'-?\d+(?:\.\d+)?').fullmatch
+
+# ---------- opcodes ----------
+
+LOAD_CONST = 0     # push consts[arg]
+LOAD_VAR = 1       # push vars[arg] (slot), or the name itself if unset
+STORE_VAR = 2      # vars[arg] = pop
+ADD = 3            # push pop + pop  (numeric or string concat)
+SUB = 4
+MUL = 5
+DIV = 6
+CMP_EQ = 7
+CMP_GT = 8
+CMP_LT = 9
+JMP_IF_FALSE_OR_POP = 10  # short-circuit 'and': jump keeping a falsy value
+JMP_IF_TRUE_OR_POP = 11   # short-circuit 'or': jump keeping a truthy value
+JMP = 12           # pc = arg
+JMP_IF_FALSE = 13  # pc = arg if not pop
+POP = 14
+DISPLAY = 15       # print(pop)
+INPUT = 16         # vars[arg] = input(pop)
+BUILD_LIST = 17    # push [pop() * arg]
+LENGTH = 18        # push len(str(pop))
+COUNT = 19         # push len(vars[arg]) (0 when unset)
+INDEX = 20         # push vars[arg] at pop (1-based)
+COLUMN = 21        # push column pop of vars[arg]
+APPEND = 22        # vars[arg].append(pop)
+REMOVE = 23        # vars[arg].remove(pop)
+WRITE_FILE = 24    # filename = pop, content = pop
+READ_FILE = 25     # vars[arg] = contents of file pop
+CSV_READ = 26      # vars[arg] = rows of csv file pop
+CSV_WRITE = 27     # write vars[arg] to csv file pop
+CSV_SET = 28       # value = pop, col = pop, row = pop, on vars[arg]
+CALL_SECTION = 29  # push return address, pc = arg (section offset)
+TO_INT = 30        # coerce a string repeat count to int (0 on failure)
+REPEAT_TEST = 31   # if top <= 0: pop, pc = arg; else top -= 1
+FOR_ITER = 32      # iterate list under an index counter (see VM)
+RETURN = 33        # pc = pop of the return-address stack
+SECTION_MISSING = 34  # report a call to an undefined section
+ADD_NUM = 35       # ADD specialised for statically numeric operands
+RUN_NATIVE = 36    # run a lifted loop body: arg(vars, names, pop())
+INC_VAR_CONST = 37  # superinstruction: var = var plus <const>
+LIST_CONST = 38    # push a fresh list copied from a tuple constant
+
+# opcodes whose argument is a code offset; the peephole pass must
+# remap these when it shrinks the instruction stream
+_JUMP_OPS = frozenset((JMP, JMP_IF_FALSE, JMP_IF_FALSE_OR_POP,
+                       JMP_IF_TRUE_OR_POP, REPEAT_TEST, FOR_ITER,
+                       CALL_SECTION))
+
+# marks a variable slot that has never been assigned
+_UNSET = object()
+
+_WHILE_WARNING = ("(Warning: While loop stopped after 10,000 iterations "
+                  "to prevent infinite loop)")
+
+
+class CompileError(Exception):
+    """Raised when the compiler meets a tree shape it cannot lower."""
+    pass
+
+
+class CodeObject:
+    """A compiled Corvo program: instructions, constants and sections."""
+
+    def __init__(self, code, consts, sections, boundaries, names=()):
+        self.code = code          # list of (opcode, arg) tuples
+        self.consts = consts      # constant pool
+        self.sections = sections  # section name -> code offset
+        self.boundaries = boundaries  # start offsets of each statement
+        self.names = names        # variable slot -> source name
+
+
+# ---------- compiler ----------
+
+class Compiler:
+    """
+    Walks the Lark parse tree once and emits flat bytecode.
+
+    Statements append instructions to self.code; expressions leave
+    their result on the VM stack.
+    """
+
+    def __init__(self):
+        self.code = []
+        self.consts = []
+        self.sections = {}
+        self.symtab = {}
+        self.pending_calls = []
+        self.section_spans = {}
+        self.const_index = {}
+
+    def slot(self, name):
+        name = str(name)
+        if name not in self.symtab:
+            self.symtab[name] = len(self.symtab)
+        return self.symtab[name]
+
+    def const(self, value):
+        # dedup by type as well as value: 1 == 1.0 (and (1, 2) == (1.0, 2))
+        # but the pair must not share a pool slot
+        if type(value) is tuple:
+            key = (tuple, tuple((type(v), v) for v in value))
+        else:
+            key = (type(value), value)
+        index = self.const_index.get(key)
+        if index is None:
+            index = self.const_index[key] = len(self.consts)
+            self.consts.append(value)
+        return index
+
+    def emit(self, op, arg=None):
+        self.code.append((op, arg))
+        return len(self.code) - 1
+
+    def patch(self, at, target):
+        op, _ = self.code[at]
+        self.code[at] = (op, target)
+
+    # ----- tree helpers -----
+
+    def unwrap(self, node):
+        # statement / expr / condition wrappers carry a single child
+        while (hasattr(node, 'data') and str(node.data) in
+                ('statement', 'simple_statement', 'expr', 'condition',
+                 'comparator')
+                and len(node.children) == 1):
+            node = node.children[0]
+        return node
+
+    def subtrees(self, items):
+        # drop keyword tokens (LOOPS, OTHERWISE, ...) between operands
+        return [item for item in items
+                if hasattr(item, 'data') or getattr(item, 'type', None)
+                in ('WORD', 'STRING', 'NUMBER')]
+
+    def literal_values(self, children):
+        """Return the element tuple of an all-literal list, or None."""
+        values = []
+        for child in children:
+            child = self.unwrap(child)
+            token_type = getattr(child, 'type', None)
+            if token_type == 'STRING':
+                values.append(str(child)[1:-1])
+            elif token_type == 'NUMBER':
+                text = str(child)
+                values.append(float(text) if '.' in text else int(text))
+            else:
+                return None
+        return tuple(values)
+
+    # ----- entry point -----
+
+    def compile_program(self, tree):
+        boundaries = []
+        for stmt in tree.children:
+            boundaries.append(len(self.code))
+            self.statement(stmt)
+        # resolve section calls now that every definition has an offset
+        for at in self.pending_calls:
+            op, name = self.code[at]
+            if name in self.sections:
+                self.code[at] = (CALL_SECTION, self.sections[name])
+            else:
+                self.code[at] = (SECTION_MISSING, name)
+        boundaries = self.inline_sections(boundaries)
+        boundaries = self.peephole(boundaries)
+        return CodeObject(self.code, self.consts, self.sections, boundaries)
+
+    def inline_sections(self, boundaries):
+        """Splice single-use sections into their only call site.
+
+        A section called exactly once pays the call/return machinery
+        for nothing; its body is moved to the call site and the
+        definition dropped, so the statements run in place like any
+        other block. Sections that call other sections (including
+        themselves), contain nested definitions, or are called more
+        than once keep the CALL_SECTION path.
+        """
+        code = self.code
+        calls = {}
+        for i, (op, arg) in enumerate(code):
+            if op == CALL_SECTION:
+                calls.setdefault(arg, []).append(i)
+        plan = {}  # call site -> (body start, RETURN index)
+        drop = {}  # definition start (skip JMP) -> RETURN index
+        for name, (def_start, ret_at) in self.section_spans.items():
+            offset = self.sections.get(name)
+            sites = calls.get(offset, ())
+            if len(sites) != 1:
+                continue
+            call_at = sites[0]
+            if def_start <= call_at <= ret_at:
+                continue
+            body = code[offset:ret_at]
+            if any(op in (CALL_SECTION, SECTION_MISSING, RETURN)
+                   for op, _ in body):
+                continue
+            plan[call_at] = (offset, ret_at)
+            drop[def_start] = ret_at
+            del self.sections[name]
+        if not plan:
+            return boundaries
+        new = []
+        mapping = {}
+        i = 0
+        while i < len(code):
+            if i in drop:
+                mapping[i] = len(new)
+                i = drop[i] + 1
+            elif i in plan:
+                offset, ret_at = plan[i]
+                mapping[i] = len(new)
+                for j in range(offset, ret_at):
+                    mapping[j] = len(new)
+                    new.append(code[j])
+                mapping[ret_at] = len(new)
+                i += 1
+            else:
+                mapping[i] = len(new)
+                new.append(code[i])
+                i += 1
+        mapping[len(code)] = len(new)
+        self.code = [(op, mapping[arg]) if op in _JUMP_OPS else (op, arg)
+                     for op, arg in new]
+        self.sections = {name: mapping[at]
+                         for name, at in self.sections.items()}
+        self.section_spans = {}
+        return [mapping[at] for at in boundaries]
+
+    def peephole(self, boundaries):
+        """Fuse hot opcode sequences into superinstructions.
+
+        The common counter update ``the i is i plus 1`` compiles to
+        LOAD_VAR / LOAD_CONST / ADD / STORE_VAR on the same slot; one
+        INC_VAR_CONST replaces all four, cutting dispatch per loop
+        iteration.  Jump targets, section offsets and statement
+        boundaries are remapped to the shrunken stream.
+        """
+        code = self.code
+        targets = {arg for op, arg in code if op in _JUMP_OPS}
+        fused = []
+        mapping = [0] * (len(code) + 1)
+        i = 0
+        while i < len(code):
+            mapping[i] = len(fused)
+            if (i + 3 < len(code)
+                    and code[i][0] == LOAD_VAR
+                    and code[i + 1][0] == LOAD_CONST
+                    and code[i + 2][0] in (ADD, ADD_NUM)
+                    and code[i + 3][0] == STORE_VAR
+                    and code[i + 3][1] == code[i][1]
+                    and not targets & {i + 1, i + 2, i + 3}):
+                slot = code[i][1]
+                value = self.consts[code[i + 1][1]]
+                for j in (i + 1, i + 2, i + 3):
+                    mapping[j] = len(fused)
+                fused.append((INC_VAR_CONST, (slot, value)))
+                i += 4
+            else:
+                fused.append(code[i])
+                i += 1
+        mapping[len(code)] = len(fused)
+        self.code = [(op, mapping[arg]) if op in _JUMP_OPS else (op, arg)
+                     for op, arg in fused]
+        self.sections = {name: mapping[at]
+                         for name, at in self.sections.items()}
+        return [mapping[at] for at in boundaries]
+
+    def statement(self, node):
+        node = self.unwrap(node)
+        if not hasattr(node, 'data'):
+            # a bare WORD statement is a section call
+            self.pending_calls.append(self.emit(CALL_SECTION, str(node)))
+            return
+        name = str(node.data)
+        method = getattr(self, 'c_' + name, None)
+        if method is None:
+            raise CompileError(f"Cannot compile statement '{name}'")
+        method(node.children)
+
+    # ----- expressions -----
+
+    def expr(self, node):
+        """Emit code for an expression; returns 'num' when the result
+        is statically known to be numeric, else 'any'."""
+        node = self.unwrap(node)
+        if not hasattr(node, 'data'):
+            token_type = getattr(node, 'type', None)
+            if token_type == 'STRING':
+                self.emit(LOAD_CONST, self.const(str(node)[1:-1]))
+            elif token_type == 'NUMBER':
+                text = str(node)
+                value = float(text) if '.' in text else int(text)
+                self.emit(LOAD_CONST, self.const(value))
+                return 'num'
+            else:
+                self.emit(LOAD_VAR, self.slot(node))
+            return 'any'
+        name = str(node.data)
+        if name == 'concat':
+            left, right = self.subtrees(node.children)
+            left_type = self.expr(left)
+            right_type = self.expr(right)
+            # both sides provably numeric: skip the string-sniffing
+            # coercion that the generic ADD performs per operand
+            if left_type == 'num' and right_type == 'num':
+                self.emit(ADD_NUM)
+                return 'num'
+            self.emit(ADD)
+        elif name in ('subtract', 'multiply', 'divide'):
+            left, right = self.subtrees(node.children)
+            self.expr(left)
+            self.expr(right)
+            self.emit({'subtract': SUB, 'multiply': MUL, 'divide': DIV}[name])
+            return 'num'
+        elif name == 'list':
+            children = [c for c in node.children if c is not None]
+            values = self.literal_values(children)
+            if values is not None:
+                # an all-literal list is kept as one tuple constant and
+                # materialised with a single C-level copy, instead of a
+                # push per element and a slice off the stack
+                self.emit(LIST_CONST, self.const(values))
+            else:
+                for child in children:
+                    self.expr(child)
+                self.emit(BUILD_LIST, len(children))
+        elif name == 'length':
+            self.expr(self.subtrees(node.children[1:])[0])
+            self.emit(LENGTH)
+            return 'num'
+        elif name == 'count':
+            self.emit(COUNT, self.slot(node.children[-1]))
+            return 'num'
+        elif name == 'index_access':
+            varslot = self.slot(node.children[0])
+            self.expr(node.children[-1])
+            self.emit(INDEX, varslot)
+        elif name == 'column_access':
+            varslot = self.slot(node.children[-1])
+            self.expr(self.subtrees(node.children)[0])
+            self.emit(COLUMN, varslot)
+        else:
+            raise CompileError(f"Cannot compile expression '{name}'")
+        return 'any'
+
+    # ----- conditions -----
+
+    def condition(self, node):
+        node = self.unwrap(node)
+        name = str(node.data)
+        if name == 'base_condition':
+            left, op, right = node.children
+            self.expr(left)
+            self.expr(right)
+            op = self.unwrap(op)
+            op_type = getattr(op, 'type', str(op))
+            self.emit({'IS_EQUAL_TO': CMP_EQ,
+                       'IS_GREATER_THAN': CMP_GT,
+                       'IS_LESS_THAN': CMP_LT}[op_type])
+        elif name in ('and_', 'or_'):
+            # short-circuit: the right side is skipped entirely when
+            # the left side already decides the outcome
+            left, _, right = node.children
+            self.condition(left)
+            jump = self.emit(JMP_IF_FALSE_OR_POP if name == 'and_'
+                             else JMP_IF_TRUE_OR_POP)
+            self.condition(right)
+            self.patch(jump, len(self.code))
+        else:
+            raise CompileError(f"Cannot compile condition '{name}'")
+
+    # ----- statements -----
+
+    def c_assignment(self, items):
+        varname, value = items
+        self.expr(value)
+        self.emit(STORE_VAR, self.slot(varname))
+
+    def c_display(self, items):
+        self.expr(items[0])
+        self.emit(DISPLAY)
+
+    def c_input(self, items):
+        prompt, _, varname = items
+        self.expr(prompt)
+        self.emit(INPUT, self.slot(varname))
+
+    def c_if_only(self, items):
+        condition, stmt = items
+        self.condition(condition)
+        jump = self.emit(JMP_IF_FALSE)
+        self.statement(stmt)
+        self.patch(jump, len(self.code))
+
+    def c_if_else(self, items):
+        trees = self.subtrees(items)
+        condition, then_stmt, else_stmt = trees
+        self.condition(condition)
+        jump_else = self.emit(JMP_IF_FALSE)
+        self.statement(then_stmt)
+        jump_end = self.emit(JMP)
+        self.patch(jump_else, len(self.code))
+        self.statement(else_stmt)
+        self.patch(jump_end, len(self.code))
+
+    def c_if_only_block(self, items):
+        condition = items[0]
+        self.condition(condition)
+        jump = self.emit(JMP_IF_FALSE)
+        for stmt in items[1:]:
+            self.statement(stmt)
+        self.patch(jump, len(self.code))
+
+    def c_if_else_block(self, items):
+        otherwise_index = -1
+        for i, item in enumerate(items):
+            if getattr(item, 'type', None) == 'OTHERWISE':
+                otherwise_index = i
+                break
+        if otherwise_index == -1:
+            self.c_if_only_block(items)
+            return
+        self.condition(items[0])
+        jump_else = self.emit(JMP_IF_FALSE)
+        for stmt in items[1:otherwise_index]:
+            self.statement(stmt)
+        jump_end = self.emit(JMP)
+        self.patch(jump_else, len(self.code))
+        for stmt in items[otherwise_index + 1:]:
+            self.statement(stmt)
+        self.patch(jump_end, len(self.code))
+
+    def c_repeat_single(self, items):
+        times, _, stmt = items
+        self.compile_repeat(times, [stmt])
+
+    def c_repeat_block(self, items):
+        self.compile_repeat(items[0], items[2:])
+
+    # opcodes a lifted repeat body may contain: straight-line
+    # arithmetic over variables and constants, nothing with I/O,
+    # control flow or lists
+    _LIFTABLE = frozenset((LOAD_CONST, LOAD_VAR, STORE_VAR,
+                           ADD, ADD_NUM, SUB, MUL, DIV))
+
+    def compile_repeat(self, times, body):
+        self.expr(times)
+        self.emit(TO_INT)
+        start = len(self.code)
+        pending = len(self.pending_calls)
+        sections = dict(self.sections)
+        spans = dict(self.section_spans)
+        for stmt in body:
+            self.statement(stmt)
+        native = self.lift_loop(self.code[start:])
+        # roll the probe pass back either way; the non-lifted path
+        # re-emits the body inside the loop skeleton below
+        del self.code[start:]
+        del self.pending_calls[pending:]
+        self.sections = sections
+        self.section_spans = spans
+        if native is not None:
+            # replace the whole loop with one opcode running the
+            # generated function; the VM never dispatches the body
+            self.emit(RUN_NATIVE, native)
+            return
+        top = len(self.code)
+        test = self.emit(REPEAT_TEST)
+        for stmt in body:
+            self.statement(stmt)
+        self.emit(JMP, top)
+        self.patch(test, len(self.code))
+
+    def lift_loop(self, region):
+        """Translate a pure-arithmetic loop body into one generated
+        Python function f(vars, names, n), or return None.
+
+        Running the body as real Python removes all per-iteration
+        opcode dispatch; variables live in locals for the duration of
+        the loop and are written back once at the end.
+        """
+        if not region:
+            return None
+        if any(op not in self._LIFTABLE for op, _ in region):
+            return None
+        stack = []
+        lines = []
+        used = set()
+        stored = set()
+        for op, arg in region:
+            if op == LOAD_CONST:
+                value = self.consts[arg]
+                if not isinstance(value, (int, float)):
+                    return None
+                stack.append(repr(value))
+            elif op == LOAD_VAR:
+                used.add(arg)
+                stack.append(f"v{arg}")
+            elif op == STORE_VAR:
+                used.add(arg)
+                stored.add(arg)
+                lines.append(f"v{arg} = {stack.pop()}")
+            else:
+                right = stack.pop()
+                left = stack.pop()
+                if op == ADD:
+                    stack.append(f"_add({left}, {right})")
+                elif op == ADD_NUM:
+                    stack.append(f"({left} + {right})")
+                elif op == SUB:
+                    stack.append(f"({left} - {right})")
+                elif op == MUL:
+                    stack.append(f"({left} * {right})")
+                else:
+                    stack.append(f"_div({left}, {right})")
+        if stack or not lines:
+            return None
+        src = ["def _hot(vars, names, n):"]
+        for slot in sorted(used):
+            src.append(f"    v{slot} = vars[{slot}]")
+            src.append(f"    if v{slot} is _UNSET: v{slot} = names[{slot}]")
+        # write back in a finally so stores from completed iterations
+        # survive a mid-loop error, like the non-lifted path
+        src.append("    try:")
+        src.append("        for _ in range(n):")
+        for line in lines:
+            src.append("            " + line)
+        src.append("    finally:")
+        for slot in sorted(stored):
+            src.append(f"        vars[{slot}] = v{slot}")
+        namespace = {'_UNSET': _UNSET, '_add': _add, '_div': _div}
+        exec("\n".join(src), namespace)
+        return namespace['_hot']
+
+    def c_while(self, items):
+        condition = items[1]
+        body = items[3:]
+        # budget counter keeps the 10,000-iteration safety cap
+        self.emit(LOAD_CONST, self.const(10000))
+        top = len(self.code)
+        test = self.emit(REPEAT_TEST)
+        self.condition(condition)
+        jump_done = self.emit(JMP_IF_FALSE)
+        for stmt in body:
+            self.statement(stmt)
+        self.emit(JMP, top)
+        self.patch(test, len(self.code))
+        self.emit(LOAD_CONST, self.const(_WHILE_WARNING))
+        self.emit(DISPLAY)
+        jump_end = self.emit(JMP)
+        self.patch(jump_done, len(self.code))
+        self.emit(POP)  # discard the unused loop budget
+        self.patch(jump_end, len(self.code))
+
+    def c_for_loop(self, items):
+        trees = [item for item in items
+                 if getattr(item, 'type', None) == 'WORD'
+                 or hasattr(item, 'data')]
+        var = self.slot(trees[0])
+        list_name = self.slot(trees[1])
+        body = trees[2:]
+        self.emit(LOAD_VAR, list_name)
+        self.emit(LOAD_CONST, self.const(0))
+        top = len(self.code)
+        iter_instr = self.emit(FOR_ITER)
+        self.emit(STORE_VAR, var)
+        for stmt in body:
+            self.statement(stmt)
+        self.emit(JMP, top)
+        self.patch(iter_instr, len(self.code))
+
+    def c_list_append(self, items):
+        item, list_name = items
+        self.expr(item)
+        self.emit(APPEND, self.slot(list_name))
+
+    def c_list_remove(self, items):
+        item, list_name = items
+        self.expr(item)
+        self.emit(REMOVE, self.slot(list_name))
+
+    def c_write(self, items):
+        content, filename = items
+        self.expr(content)
+        self.expr(filename)
+        self.emit(WRITE_FILE)
+
+    def c_read(self, items):
+        trees = self.subtrees(items)
+        filename = trees[0]
+        varname = trees[-1]
+        self.expr(filename)
+        self.emit(READ_FILE, self.slot(varname))
+
+    def c_csv_read(self, items):
+        trees = self.subtrees(items)
+        self.expr(trees[0])
+        self.emit(CSV_READ, self.slot(trees[-1]))
+
+    def c_csv_write(self, items):
+        trees = self.subtrees(items)
+        varname = trees[0]
+        self.expr(trees[-1])
+        self.emit(CSV_WRITE, self.slot(varname))
+
+    def c_csv_set(self, items):
+        trees = self.subtrees(items)
+        varname = trees[0]
+        row, col, value = trees[1], trees[2], trees[3]
+        self.expr(row)
+        self.expr(col)
+        self.expr(value)
+        self.emit(CSV_SET, self.slot(varname))
+
+    def c_section_def(self, items):
+        trees = self.subtrees(items)
+        name = str(trees[0])
+        body = trees[1:]
+        # the body is emitted inline and jumped over; callers land on
+        # its offset directly, so calling a section is one indirect
+        # jump with no name lookup at runtime
+        skip = self.emit(JMP)
+        self.sections[name] = len(self.code)
+        for stmt in body:
+            self.statement(stmt)
+        ret_at = self.emit(RETURN)
+        self.section_spans[name] = (skip, ret_at)
+        self.patch(skip, len(self.code))
+
+    def c_section_call(self, items):
+        self.pending_calls.append(self.emit(CALL_SECTION, str(items[0])))
+
+
+def compile_tree(tree):
+    """Compile a parsed Corvo program into a CodeObject."""
+    compiler = Compiler()
+    code_obj = compiler.compile_program(tree)
+    code_obj.names = tuple(compiler.symtab)
+    return code_obj
+
+
+# ---------- virtual machine ----------
+
+def _to_number(value):
+    """Coerce a numeric-looking string to int/float, else return as-is."""
+    if isinstance(value, str) and _NUM_RE(value):
+        return float(value) if '.' in value else int(value)
+    return value
+
+
+def _add(left, right):
+    """'plus' semantics: numeric addition when both sides look numeric,
+    string concatenation otherwise."""
+    left = _to_number(left)
+    right = _to_number(right)
+    if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+        return left + right
+    return str(left) + str(right)
+
+
+def _div(left, right):
+    """'divided by' semantics including the division-by-zero message."""
+    if right == 0:
+        print("(Error: Division by zero)")
+        return 0
+    return left / right
+
+
+# Each opcode gets one small handler taking (vm, stack, arg, pc) and
+# returning the next pc. The VM loop is then a single dispatch site:
+# one indexed load from HANDLERS plus one call per instruction, which
+# the branch predictor learns far better than a long if/elif ladder.
+
+def _op_load_const(vm, stack, arg, pc):
+    stack.append(vm.consts[arg])
+    return pc
+
+
+def _op_load_var(vm, stack, arg, pc):
+    value = vm.vars[arg]
+    # an unassigned name evaluates to itself, the same fallback the
+    # tree-walker's evaluate() has
+    stack.append(vm.names[arg] if value is _UNSET else value)
+    return pc
+
+
+def _op_store_var(vm, stack, arg, pc):
+    vm.vars[arg] = stack.pop()
+    return pc
+
+
+def _op_add(vm, stack, arg, pc):
+    right = stack.pop()
+    stack.append(_add(stack.pop(), right))
+    return pc
+
+
+def _op_sub(vm, stack, arg, pc):
+    right = stack.pop()
+    stack.append(stack.pop() - right)
+    return pc
+
+
+def _op_mul(vm, stack, arg, pc):
+    right = stack.pop()
+    stack.append(stack.pop() * right)
+    return pc
+
+
+def _op_div(vm, stack, arg, pc):
+    right = stack.pop()
+    stack.append(_div(stack.pop(), right))
+    return pc
+
+
+def _op_cmp_eq(vm, stack, arg, pc):
+    right = stack.pop()
+    stack.append(stack.pop() == right)
+    return pc
+
+
+def _op_cmp_gt(vm, stack, arg, pc):
+    right = stack.pop()
+    stack.append(stack.pop() > right)
+    return pc
+
+
+def _op_cmp_lt(vm, stack, arg, pc):
+    right = stack.pop()
+    stack.append(stack.pop() < right)
+    return pc
+
+
+def _op_jmp_if_false_or_pop(vm, stack, arg, pc):
+    if stack[-1]:
+        stack.pop()
+        return pc
+    return arg
+
+
+def _op_jmp_if_true_or_pop(vm, stack, arg, pc):
+    if stack[-1]:
+        return arg
+    stack.pop()
+    return pc
+
+
+def _op_jmp(vm, stack, arg, pc):
+    return arg
+
+
+def _op_jmp_if_false(vm, stack, arg, pc):
+    return pc if stack.pop() else arg
+
+
+def _op_pop(vm, stack, arg, pc):
+    stack.pop()
+    return pc
+
+
+def _op_display(vm, stack, arg, pc):
+    print(stack.pop())
+    return pc
+
+
+def _op_input(vm, stack, arg, pc):
+    user_input = input(stack.pop()).strip()
+    try:
+        if '.' in user_input:
+            user_input = float(user_input)
+        else:
+            user_input = int(user_input)
+    except ValueError:
+        pass
+    vm.vars[arg] = user_input
+    return pc
+
+
+def _op_build_list(vm, stack, arg, pc):
+    if arg:
+        items = stack[-arg:]
+        del stack[-arg:]
+    else:
+        items = []
+    stack.append(items)
+    return pc
+
+
+def _op_list_const(vm, stack, arg, pc):
+    stack.append(list(vm.consts[arg]))
+    return pc
+
+
+def _op_length(vm, stack, arg, pc):
+    stack.append(len(str(stack.pop())))
+    return pc
+
+
+def _op_count(vm, stack, arg, pc):
+    value = vm.vars[arg]
+    stack.append(0 if value is _UNSET else len(value))
+    return pc
+
+
+def _op_index(vm, stack, arg, pc):
+    stack.append(vm.index_access(arg, stack.pop()))
+    return pc
+
+
+def _op_column(vm, stack, arg, pc):
+    stack.append(vm.column_access(arg, stack.pop()))
+    return pc
+
+
+def _op_append(vm, stack, arg, pc):
+    value = stack.pop()
+    lst = vm.vars[arg]
+    if lst is _UNSET:
+        lst = vm.vars[arg] = []
+    if isinstance(lst, list):
+        lst.append(value)
+    return pc
+
+
+def _op_remove(vm, stack, arg, pc):
+    value = stack.pop()
+    lst = vm.vars[arg]
+    if isinstance(lst, list):
+        try:
+            lst.remove(value)
+        except ValueError:
+            pass
+    return pc
+
+
+def _op_write_file(vm, stack, arg, pc):
+    filename = stack.pop()
+    content = stack.pop()
+    with open(filename, 'w') as f:
+        f.write(str(content))
+    return pc
+
+
+def _op_read_file(vm, stack, arg, pc):
+    vm.read_file(arg, stack.pop())
+    return pc
+
+
+def _op_csv_read(vm, stack, arg, pc):
+    vm.csv_read(arg, stack.pop())
+    return pc
+
+
+def _op_csv_write(vm, stack, arg, pc):
+    vm.csv_write(arg, stack.pop())
+    return pc
+
+
+def _op_csv_set(vm, stack, arg, pc):
+    value = stack.pop()
+    col = stack.pop()
+    row = stack.pop()
+    vm.csv_set(arg, row, col, value)
+    return pc
+
+
+def _op_call_section(vm, stack, arg, pc):
+    retstack = vm.retstack
+    if len(retstack) > 1000:
+        raise RecursionError("maximum section recursion depth exceeded")
+    retstack.append(pc)
+    return arg
+
+
+def _op_return(vm, stack, arg, pc):
+    return vm.retstack.pop()
+
+
+def _op_section_missing(vm, stack, arg, pc):
+    print(f"(Error: Section '{arg}' not defined.)")
+    return pc
+
+
+def _op_add_num(vm, stack, arg, pc):
+    right = stack.pop()
+    stack.append(stack.pop() + right)
+    return pc
+
+
+def _op_run_native(vm, stack, arg, pc):
+    arg(vm.vars, vm.names, stack.pop())
+    return pc
+
+
+def _op_inc_var_const(vm, stack, arg, pc):
+    slot, value = arg
+    current = vm.vars[slot]
+    if current is _UNSET:
+        current = vm.names[slot]
+    vm.vars[slot] = _add(current, value)
+    return pc
+
+
+def _op_to_int(vm, stack, arg, pc):
+    value = stack.pop()
+    if isinstance(value, str):
+        try:
+            value = int(value)
+        except ValueError:
+            value = 0
+    elif not isinstance(value, int):
+        # don't truncate a float count: the tree-walker's range() call
+        # rejects it, and both engines must error alike
+        raise TypeError(
+            f"'{type(value).__name__}' object cannot be "
+            "interpreted as an integer")
+    stack.append(value)
+    return pc
+
+
+def _op_repeat_test(vm, stack, arg, pc):
+    if stack[-1] <= 0:
+        stack.pop()
+        return arg
+    stack[-1] -= 1
+    return pc
+
+
+def _op_for_iter(vm, stack, arg, pc):
+    i = stack.pop()
+    lst = stack[-1]
+    if not isinstance(lst, list) or i >= len(lst):
+        stack.pop()
+        return arg
+    stack.append(i + 1)
+    stack.append(lst[i])
+    return pc
+
+
+HANDLERS = [None] * 39
+HANDLERS[LOAD_CONST] = _op_load_const
+HANDLERS[LOAD_VAR] = _op_load_var
+HANDLERS[STORE_VAR] = _op_store_var
+HANDLERS[ADD] = _op_add
+HANDLERS[SUB] = _op_sub
+HANDLERS[MUL] = _op_mul
+HANDLERS[DIV] = _op_div
+HANDLERS[CMP_EQ] = _op_cmp_eq
+HANDLERS[CMP_GT] = _op_cmp_gt
+HANDLERS[CMP_LT] = _op_cmp_lt
+HANDLERS[JMP_IF_FALSE_OR_POP] = _op_jmp_if_false_or_pop
+HANDLERS[JMP_IF_TRUE_OR_POP] = _op_jmp_if_true_or_pop
+HANDLERS[JMP] = _op_jmp
+HANDLERS[JMP_IF_FALSE] = _op_jmp_if_false
+HANDLERS[POP] = _op_pop
+HANDLERS[DISPLAY] = _op_display
+HANDLERS[INPUT] = _op_input
+HANDLERS[BUILD_LIST] = _op_build_list
+HANDLERS[LIST_CONST] = _op_list_const
+HANDLERS[LENGTH] = _op_length
+HANDLERS[COUNT] = _op_count
+HANDLERS[INDEX] = _op_index
+HANDLERS[COLUMN] = _op_column
+HANDLERS[APPEND] = _op_append
+HANDLERS[REMOVE] = _op_remove
+HANDLERS[WRITE_FILE] = _op_write_file
+HANDLERS[READ_FILE] = _op_read_file
+HANDLERS[CSV_READ] = _op_csv_read
+HANDLERS[CSV_WRITE] = _op_csv_write
+HANDLERS[CSV_SET] = _op_csv_set
+HANDLERS[CALL_SECTION] = _op_call_section
+HANDLERS[RETURN] = _op_return
+HANDLERS[SECTION_MISSING] = _op_section_missing
+HANDLERS[ADD_NUM] = _op_add_num
+HANDLERS[RUN_NATIVE] = _op_run_native
+HANDLERS[INC_VAR_CONST] = _op_inc_var_const
+HANDLERS[TO_INT] = _op_to_int
+HANDLERS[REPEAT_TEST] = _op_repeat_test
+HANDLERS[FOR_ITER] = _op_for_iter
+
+
+class CorvoVM:
+    """Executes compiled Corvo bytecode with a single dispatch loop."""
+
+    def __init__(self):
+        self.vars = None
+        self.names = ()
+        self.consts = ()
+        self.code_obj = None
+        self.retstack = []
+
+    def run(self, code_obj):
+        code = code_obj.code
+        if self.vars is None:
+            # one flat slot array shared by the program and its sections
+            self.vars = [_UNSET] * len(code_obj.names)
+            self.names = code_obj.names
+        self.consts = code_obj.consts
+        self.code_obj = code_obj
+        self.retstack = []
+        handlers = HANDLERS
+        stack = []
+        pc = 0
+        n = len(code)
+
+        while pc < n:
+            try:
+                while pc < n:
+                    op, arg = code[pc]
+                    pc = handlers[op](self, stack, arg, pc + 1)
+            except Exception as e:
+                print(f"Error executing statement: {e}")
+                # resume after the top-level statement that failed; a
+                # failure inside a section unwinds to its outermost call
+                if self.retstack:
+                    failed_at = self.retstack[0] - 1
+                    del self.retstack[:]
+                else:
+                    failed_at = pc
+                pc = n
+                for start in code_obj.boundaries:
+                    if start > failed_at:
+                        pc = start
+                        break
+                del stack[:]
+
+    # ----- helpers mirroring the tree-walking interpreter -----
+
+    def index_access(self, slot, idx):
+        varname = self.names[slot]
+        lst = self.vars[slot]
+        if lst is _UNSET:
+            lst = None
+        if isinstance(idx, str):
+            try:
+                idx = int(idx)
+            except ValueError:
+                print(f"(Error: Index '{idx}' is not a valid number.)")
+                return ""
+        if not isinstance(lst, list):
+            print(f"(Error: {varname} is not a list.)")
+            return ""
+        if not (1 <= idx <= len(lst)):
+            print(f"(Error: Index {idx} out of range for list '{varname}'.)")
+            return ""
+        return lst[idx - 1]
+
+    def column_access(self, slot, col_idx):
+        varname = self.names[slot]
+        data = self.vars[slot]
+        if data is _UNSET:
+            data = []
+        if not isinstance(data, list):
+            print(f"(Error: {varname} is not a list.)")
+            return []
+        if isinstance(col_idx, str):
+            try:
+                col_idx = int(col_idx)
+            except ValueError:
+                print(f"(Error: Column '{col_idx}' is not a valid number.)")
+                return []
+        # hoist the 1-based shift and run one comprehension so the
+        # per-row work is a single index plus bounds check
+        idx = col_idx - 1
+        if idx < 0:
+            return [""] * len(data)
+        return [row[idx] if isinstance(row, list) and idx < len(row)
+                else "" for row in data]
+
+    def read_file(self, slot, filename):
+        try:
+            with open(filename, 'r') as f:
+                self.vars[slot] = f.read().strip()
+        except FileNotFoundError:
+            print(f"(Error: File {filename} not found.)")
+            self.vars[slot] = ""
+
+    def csv_read(self, slot, filename):
+        try:
+            with open(filename, 'r', newline='', encoding='utf-8') as f:
+                # materialise rows in the C csv layer instead of a
+                # Python-level append loop
+                self.vars[slot] = list(csv.reader(f))
+        except FileNotFoundError:
+            print(f"(Error: CSV file {filename} not found.)")
+            self.vars[slot] = []
+        except Exception as e:
+            print(f"(Error reading CSV: {e})")
+            self.vars[slot] = []
+
+    def csv_write(self, slot, filename):
+        try:
+            varname = self.names[slot]
+            data = self.vars[slot]
+            if data is _UNSET:
+                data = []
+            if not isinstance(data, list):
+                print(f"(Error: {varname} is not a list, cannot write to CSV)")
+                return
+            with open(filename, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerows(row if isinstance(row, list) else [row]
+                                 for row in data)
+        except Exception as e:
+            print(f"(Error writing CSV: {e})")
+
+    def csv_set(self, slot, row_idx, col_idx, new_value):
+        varname = self.names[slot]
+        data = self.vars[slot]
+        if data is _UNSET:
+            data = []
+        if not isinstance(data, list):
+            print(f"(Error: {varname} is not a list.)")
+            return
+        if isinstance(row_idx, str):
+            try:
+                row_idx = int(row_idx)
+            except ValueError:
+                print(f"(Error: Row '{row_idx}' is not a valid number.)")
+                return
+        if isinstance(col_idx, str):
+            try:
+                col_idx = int(col_idx)
+            except ValueError:
+                print(f"(Error: Column '{col_idx}' is not a valid number.)")
+                return
+        if not (1 <= row_idx <= len(data)):
+            print(f"(Error: Row {row_idx} out of range. "
+                  f"Data has {len(data)} rows.)")
+            return
+        target_row = data[row_idx - 1]
+        if not isinstance(target_row, list):
+            print(f"(Error: Row {row_idx} is not a list.)")
+            return
+        if not (1 <= col_idx <= len(target_row)):
+            print(f"(Error: Column {col_idx} out of range. "
+                  f"Row {row_idx} has {len(target_row)} columns.)")
+            return
+        data[row_idx - 1][col_idx - 1] = str(new_value)
+
+
+def run_compiled(tree):
+    """Compile a parse tree and execute it on a fresh VM."""
+    CorvoVM().run(compile_tree(tree))
@@ -0,0 +1,26 @@
+# Corvo optional compiled build
+# Copyright (c) 2025 Austin (GitHub: TotoroEmotoro)
+# Licensed under the Corvo Source-Available License, Version 1.0.
+# See the LICENSE file for full license text.
+#
+# Corvo runs fine as plain Python; this build is optional. Cython's
+# pure-Python mode compiles the interpreter modules as they are, so
+# there is no .pyx fork to keep in sync - the same browser_runtime.py
+# that Pyodide loads as source is what gets compiled here. Once built
+# (python setup.py build_ext --inplace), the extension modules shadow
+# the .py files on import and remove CPython bytecode dispatch from
+# the closure and VM hot paths.
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name='corvo',
+    ext_modules=cythonize(
+        [
+            'interpreter/browser_runtime.py',
+            'interpreter/corvo_vm.py',
+        ],
+        language_level=3,
+    ),
+)